@@ -0,0 +1,71 @@
+"""Check the simulated CP hints against the MIP with the ordering fixed.
+
+For every instance the best heuristic ordering is fixed in the paper MIP and
+its ``TimeFinish`` values compared with ``cp.get_wait_times``. The simulation
+is the earliest schedule of the ordering, so the makespans must agree and no
+MIP finish time may be earlier than the simulated one; the MIP can leave
+slack off the critical path.
+
+    python3 benchmarks/cp_hints.py --size-class 10 2 --instances 10
+"""
+
+# Hack import trick for relative imports
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import argparse
+
+from engines.cp import get_wait_times
+from engines.heuristic_search import get_best_heuristic
+from engines.mip import MIP
+from util import AirplaneBoardingProblem, AbpFilepath, discretise
+
+TOLERANCE = 1e-6
+
+
+def check_instance(filepath: AbpFilepath) -> dict:
+    abp = AirplaneBoardingProblem(filepath)
+    solution = get_best_heuristic(abp)
+    simulated, _ = get_wait_times(abp, solution)
+    fixed = MIP.fixed_order_finish_times(abp, solution)
+
+    # The MIP has no row 0, the aisle entrance
+    slack = [fixed[key] - simulated[key] for key in fixed]
+    return dict(
+        instance=f"{filepath.num_rows}_{filepath.num_columns}__{filepath.test_number}",
+        simulated_makespan=max(simulated.values()),
+        mip_makespan=max(fixed.values()),
+        earlier=sum(s < -TOLERANCE for s in slack),
+        slack=sum(s > TOLERANCE for s in slack),
+        finish_times=len(slack),
+        agrees=abs(max(fixed.values()) - discretise(solution.makespan)) < TOLERANCE
+        and min(slack) >= -TOLERANCE,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--size-class", type=int, nargs=2, default=(10, 2))
+    parser.add_argument("--instances", type=int, default=10)
+    args = parser.parse_args()
+
+    results = [
+        check_instance(AbpFilepath(*args.size_class, test_number))
+        for test_number in range(args.instances)
+    ]
+
+    # Gurobi logs are long, print the table once everything is done
+    print(
+        f"{'instance':12} {'simulated':>10} {'mip':>10} {'earlier':>8} {'slack':>6} {'of':>5}"
+    )
+    for r in results:
+        print(
+            f"{r['instance']:12} {r['simulated_makespan'] / 10:>10.1f} {r['mip_makespan'] / 10:>10.1f}"
+            f" {r['earlier']:>8} {r['slack']:>6} {r['finish_times']:>5}"
+            f"  {'ok' if r['agrees'] else 'MISMATCH'}"
+        )
+    sys.exit(0 if all(r["agrees"] for r in results) else 1)
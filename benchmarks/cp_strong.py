@@ -0,0 +1,60 @@
+"""Compare the CP model against the strong CP model on the 30 row instances."""
+
+# Hack import trick for relative imports
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import argparse
+
+from engines.cp import CP, StrongCP
+from util import AirplaneBoardingProblem, AbpFilepath, TIME_LIMIT
+
+SIZE_CLASSES = [(30, 2), (30, 4), (30, 6)]
+
+
+def benchmark_instance(filepath: AbpFilepath, time_limit: float) -> list[dict]:
+    abp = AirplaneBoardingProblem(filepath)
+
+    results = []
+    for solver_type in (CP, StrongCP):
+        solver = solver_type()
+        solver.time_limit = time_limit
+        solution = solver.solve(abp)
+        results.append(
+            dict(
+                solver=solver_type.__name__,
+                instance=f"{filepath.num_rows}_{filepath.num_columns}__{filepath.test_number}",
+                lower_bound=solution.lower_bound,
+                upper_bound=solution.upper_bound,
+                gap=100 * (1 - solution.lower_bound / solution.upper_bound),
+                time=solution.computation_time,
+            )
+        )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--instances", type=int, default=1, help="per size class")
+    parser.add_argument("--time-limit", type=float, default=TIME_LIMIT)
+    args = parser.parse_args()
+
+    results = [
+        r
+        for num_rows, num_cols in SIZE_CLASSES
+        for test_number in range(args.instances)
+        for r in benchmark_instance(
+            AbpFilepath(num_rows, num_cols, test_number), args.time_limit
+        )
+    ]
+
+    # Solver logs are long, print the table once everything is done
+    print(
+        f"{'instance':12} {'solver':10} {'lower_bound':>12} {'upper_bound':>12} {'gap (%)':>8} {'time (s)':>9}"
+    )
+    for r in results:
+        print(
+            f"{r['instance']:12} {r['solver']:10} {r['lower_bound']:>12.1f} {r['upper_bound']:>12.1f} {r['gap']:>8.2f} {r['time']:>9.2f}"
+        )
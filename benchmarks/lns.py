@@ -0,0 +1,100 @@
+"""Anytime profile of LNS: best makespan over time.
+
+On ``data/mp_sp`` instances LNS is compared with the full CP model. CP takes
+its upper bound from ``get_best_heuristic``, whose untimed 2-opt runs for
+hours on a few hundred passengers, so on synthetic instances (``--synthetic``,
+e.g. ``--size-class 40 8`` for 320 passengers) LNS is compared with its own
+start alone: ``MaxSettleRow`` and 2-opt for the whole time limit.
+"""
+
+# Hack import trick for relative imports
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import argparse
+import time
+
+from engines.cp import CP
+from engines.lns import LNS
+from engines.max_settle_row import MaxSettleRow
+from engines.two_opt_search import two_opt_search
+from instance_generator import synthetic_problem
+from util import AirplaneBoardingProblem, AbpFilepath, TIME_LIMIT
+
+CHECKPOINTS = [1, 5, 10, 30, 60, 120, 300, 600]
+
+
+def best_at(incumbents: list[dict], seconds: float) -> float | None:
+    found = [i["makespan"] for i in incumbents if i["time"] <= seconds]
+    return min(found) if found else None
+
+
+def two_opt_profile(abp: AirplaneBoardingProblem, time_limit: float) -> list[dict]:
+    # 2-opt reports no incumbents, only its start and where it stopped
+    start = time.time()
+    solution = MaxSettleRow().solve(abp)
+    incumbents = [dict(time=time.time() - start, makespan=solution.makespan)]
+    solution = two_opt_search(abp, solution, deadline=start + time_limit)
+    incumbents.append(dict(time=time.time() - start, makespan=solution.makespan))
+    return incumbents
+
+
+def benchmark_instance(
+    filepath: AbpFilepath, time_limit: float, synthetic: bool = False
+) -> dict:
+    profiles = {}
+    if synthetic:
+        abp = synthetic_problem(*filepath)
+        profiles["2-opt"] = two_opt_profile(abp, time_limit)
+        solvers = (("LNS", LNS(seed=0)),)
+    else:
+        abp = AirplaneBoardingProblem(filepath)
+        solvers = (("CP", CP()), ("LNS", LNS(seed=0)))
+
+    for name, solver in solvers:
+        incumbents = []
+        solver.sink = incumbents.append
+        solver.time_limit = time_limit
+        solver.solve(abp)
+        profiles[name] = incumbents
+    return profiles
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--size-class", type=int, nargs=2, default=(30, 6))
+    parser.add_argument("--instances", type=int, default=1)
+    parser.add_argument("--synthetic", action="store_true")
+    parser.add_argument("--time-limit", type=float, default=TIME_LIMIT)
+    args = parser.parse_args()
+
+    num_rows, num_cols = args.size_class
+    checkpoints = [c for c in CHECKPOINTS if c < args.time_limit] + [args.time_limit]
+    results = [
+        (
+            test_number,
+            benchmark_instance(
+                AbpFilepath(num_rows, num_cols, test_number),
+                args.time_limit,
+                args.synthetic,
+            ),
+        )
+        for test_number in range(args.instances)
+    ]
+
+    # Solver logs are long, print the table once everything is done
+    print(
+        f"{'instance':12} {'solver':6}"
+        + "".join(f"{f'{c:g}s':>9}" for c in checkpoints)
+    )
+    for test_number, profiles in results:
+        for name, incumbents in profiles.items():
+            best = [best_at(incumbents, c) for c in checkpoints]
+            print(
+                f"{f'{num_rows}_{num_cols}__{test_number}':12} {name:6}"
+                + "".join(f"{b:>9.1f}" if b is not None else f"{'-':>9}" for b in best)
+            )
@@ -0,0 +1,64 @@
+"""Compare building the paper MIP model with gurobipy loops and as sparse matrices."""
+
+# Hack import trick for relative imports
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import argparse
+import time
+
+import engines.mip
+from engines.heuristic_search import get_best_heuristic
+from engines.mip import MIP
+from engines.mip_sparse import build_matrices, gurobi_model, highs_constraint
+from util import AirplaneBoardingProblem, AbpFilepath, discretise
+
+SIZE_CLASSES = [(10, 2), (20, 4), (30, 6)]
+
+
+def timed(f, *args) -> float:
+    start = time.time()
+    f(*args)
+    return time.time() - start
+
+
+def benchmark_instance(filepath: AbpFilepath) -> dict:
+    abp = AirplaneBoardingProblem(filepath)
+
+    # Both builders need the heuristic, only the model building is timed
+    heuristic_solution = get_best_heuristic(abp)
+    engines.mip.get_best_heuristic = lambda _: heuristic_solution
+    upper_bound = discretise(heuristic_solution.makespan)
+
+    matrices = build_matrices(abp, upper_bound)
+    return dict(
+        instance=f"{filepath.num_rows}_{filepath.num_columns}__{filepath.test_number}",
+        nonzeros=matrices.A.nnz,
+        gurobipy=timed(MIP.build_model, abp),
+        matrices=timed(build_matrices, abp, upper_bound),
+        gurobi=timed(lambda: gurobi_model(build_matrices(abp, upper_bound))),
+        highs=timed(lambda: highs_constraint(build_matrices(abp, upper_bound))),
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--instances", type=int, default=1, help="per size class")
+    args = parser.parse_args()
+
+    results = [
+        benchmark_instance(AbpFilepath(num_rows, num_cols, test_number))
+        for num_rows, num_cols in SIZE_CLASSES
+        for test_number in range(args.instances)
+    ]
+
+    print("Build times in seconds, gurobi and highs include building the matrices")
+    print(
+        f"{'instance':12} {'nonzeros':>9} {'gurobipy':>9} {'matrices':>9} {'gurobi':>9} {'highs':>9}"
+    )
+    for r in results:
+        print(
+            f"{r['instance']:12} {r['nonzeros']:>9} {r['gurobipy']:>9.3f} {r['matrices']:>9.3f} {r['gurobi']:>9.3f} {r['highs']:>9.3f}"
+        )
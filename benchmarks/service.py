@@ -0,0 +1,77 @@
+"""Round-trip latency of heuristic requests to a warm solve service.
+
+Compared with starting ``solve.py`` for every request, which pays for the
+interpreter, the imports and building the instance each time.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def percentile(values: list[float], q: float) -> float:
+    return sorted(values)[min(int(q * len(values)), len(values) - 1)]
+
+
+def warm_latencies(engine: str, instance: list[int], requests: int) -> list[float]:
+    service = subprocess.Popen(
+        [sys.executable, "service.py"],
+        cwd=ROOT,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+    )
+    latencies = []
+    # The first request builds the instance and is not counted
+    for i in range(requests + 1):
+        start = time.perf_counter()
+        service.stdin.write(
+            json.dumps(dict(id=i, op="solve", engine=engine, instance=instance)) + "\n"
+        )
+        service.stdin.flush()
+        response = json.loads(service.stdout.readline())
+        assert response["status"] == "done", response
+        if i:
+            latencies.append(time.perf_counter() - start)
+    service.stdin.close()
+    service.wait()
+    return latencies
+
+
+def cold_latencies(engine: str, instance: list[int], requests: int) -> list[float]:
+    latencies = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "solve.py", engine, *map(str, instance)],
+            cwd=ROOT,
+            capture_output=True,
+            check=True,
+        )
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--engine", default="max_settle_row")
+    parser.add_argument("--instance", type=int, nargs=3, default=[30, 6, 0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--cold-requests", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'mode':6} {'median (ms)':>12} {'p99 (ms)':>10}")
+    for mode, latencies in [
+        ("warm", warm_latencies(args.engine, args.instance, args.requests)),
+        ("cold", cold_latencies(args.engine, args.instance, args.cold_requests)),
+    ]:
+        print(
+            f"{mode:6} {1000 * statistics.median(latencies):>12.2f} {1000 * percentile(latencies, 0.99):>10.2f}"
+        )
@@ -0,0 +1,59 @@
+"""Import time and peak memory of a fresh process, with and without plotting.
+
+``util`` used to import matplotlib, pandas and plotly at load time, the
+``util + plotting`` case measures what every process paid for that.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+CASES = {
+    "python": "",
+    "util": "import util",
+    "util + plotting": "import util, matplotlib.pyplot, pandas, plotly.express",
+    "solve max_settle_row": (
+        "import sys, runpy; sys.argv = ['solve.py', 'max_settle_row', '30', '6', '0'];"
+        " runpy.run_path('solve.py', run_name='__main__')"
+    ),
+    "sim": "import sim",
+}
+
+# Runs a case in a fresh interpreter, printing its time and peak RSS
+CHILD = """
+import json, resource, time
+start = time.perf_counter()
+exec({code!r})
+print(json.dumps(dict(
+    time=time.perf_counter() - start,
+    rss_mb=resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+)))
+"""
+
+
+def measure(code: str) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD.format(code=code)],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'case':22} {'time (ms)':>10} {'peak RSS (MB)':>14}")
+    for name, code in CASES.items():
+        runs = [measure(code) for _ in range(args.repeats)]
+        print(
+            f"{name:22} {1000 * min(r['time'] for r in runs):>10.1f} {min(r['rss_mb'] for r in runs):>14.1f}"
+        )
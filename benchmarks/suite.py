@@ -0,0 +1,250 @@
+"""Time the hot paths on seeded synthetic instances and compare runs.
+
+``run`` writes one JSON record per (benchmark, instance) with a ``value``
+and whether higher is better, ``compare`` flags the records of a new run
+that are worse than an old run by more than a threshold.
+"""
+
+# Hack import trick for relative imports
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import subprocess
+import time
+
+import best_known
+import engines.heuristic_search
+from engines.cp import CP
+from engines.heuristic_search import get_best_heuristic
+from engines.max_settle_row import MaxSettleRow
+from engines.mip import MIP
+from engines.mip_sparse import SparseMIP, build_matrices
+from engines.two_opt_search import two_opt_search
+from instance_generator import instance_name, synthetic_problem
+from util import AirplaneBoardingProblem, discretise
+
+SIZE_CLASSES = [(10, 2), (20, 4), (30, 6), (40, 8), (60, 10), (80, 10)]
+OUTPUT = os.path.join(os.path.dirname(__file__), "suite.json")
+
+
+def best_time(f, repeats: int, number: int = 1) -> float:
+    """Fastest of ``repeats`` runs of ``number`` calls, per call."""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(number):
+            f()
+        times.append((time.perf_counter() - start) / number)
+    return min(times)
+
+
+def timing(seconds: float, **extra) -> dict:
+    return dict(value=seconds, unit="s", higher_is_better=False, **extra)
+
+
+def bench_simulate_boarding(abp: AirplaneBoardingProblem, args) -> dict:
+    solution = MaxSettleRow().solve(abp)
+    return timing(best_time(solution.simulate_boarding, args.repeats, number=100))
+
+
+def bench_two_opt_search(abp: AirplaneBoardingProblem, args) -> dict:
+    # Large instances do not finish a pass, the move rate is comparable anyway
+    start_solution = MaxSettleRow().solve(abp)
+    stats = {}
+    start = time.perf_counter()
+    solution = two_opt_search(
+        abp, start_solution, stats=stats, deadline=time.time() + args.time_box
+    )
+    elapsed = time.perf_counter() - start
+    return dict(
+        value=stats["moves_evaluated"] / elapsed,
+        unit="moves/s",
+        higher_is_better=True,
+        time=elapsed,
+        makespan=solution.makespan,
+        **stats,
+    )
+
+
+def bench_get_best_heuristic(abp: AirplaneBoardingProblem, args) -> dict:
+    def uncached():
+        engines.heuristic_search._two_opt_cache.clear()
+        get_best_heuristic(abp)
+
+    return timing(best_time(uncached, 1), makespan=get_best_heuristic(abp).makespan)
+
+
+def bench_cp_build(abp: AirplaneBoardingProblem, args) -> dict:
+    get_best_heuristic(abp)  # Cached, only the model is timed
+    return timing(best_time(lambda: CP.build_model(abp), args.repeats))
+
+
+def bench_mip_build(abp: AirplaneBoardingProblem, args) -> dict:
+    get_best_heuristic(abp)
+    return timing(best_time(lambda: MIP.build_model(abp), args.repeats))
+
+
+def bench_mip_sparse_build(abp: AirplaneBoardingProblem, args) -> dict:
+    upper_bound = discretise(get_best_heuristic(abp).makespan)
+    return timing(best_time(lambda: build_matrices(abp, upper_bound), args.repeats))
+
+
+def bench_solve(solver_type):
+    def bench(abp: AirplaneBoardingProblem, args) -> dict:
+        solver = solver_type()
+        solver.time_limit = args.time_box
+        solution = solver.solve(abp)
+        return dict(
+            value=solution.makespan,
+            unit="makespan",
+            higher_is_better=False,
+            lower_bound=solution.lower_bound,
+            time=solution.computation_time,
+        )
+
+    return bench
+
+
+# name -> (benchmark, needs the best heuristic)
+BENCHMARKS = {
+    "simulate_boarding": (bench_simulate_boarding, False),
+    "two_opt_search": (bench_two_opt_search, False),
+    "get_best_heuristic": (bench_get_best_heuristic, True),
+    "cp_build": (bench_cp_build, True),
+    "mip_build": (bench_mip_build, True),
+    "mip_sparse_build": (bench_mip_sparse_build, True),
+    "cp_solve": (bench_solve(CP), True),
+    "mip_sparse_solve": (bench_solve(SparseMIP), True),
+}
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    records = []
+    for num_rows, num_cols in args.sizes:
+        for seed in range(args.instances):
+            abp = synthetic_problem(num_rows, num_cols, seed)
+            for name in args.benchmarks:
+                bench, needs_heuristic = BENCHMARKS[name]
+                record = dict(
+                    benchmark=name,
+                    instance=instance_name(num_rows, num_cols, seed),
+                    passengers=abp.num_passengers,
+                )
+                if needs_heuristic and abp.num_passengers > args.max_heuristic_size:
+                    records.append(dict(record, skipped="instance too large"))
+                    continue
+
+                # Solver logs would drown the progress lines
+                with contextlib.redirect_stdout(io.StringIO()):
+                    record.update(bench(abp, args))
+                records.append(record)
+                print(
+                    f"{name:18} {record['instance']:22} {record['value']:>12.6g} {record['unit']}"
+                )
+
+    with open(args.output, "w") as f:
+        json.dump(
+            dict(
+                commit=git_commit(),
+                python=platform.python_version(),
+                machine=platform.platform(),
+                timestamp=time.time(),
+                records=records,
+            ),
+            f,
+            indent=2,
+        )
+    print(f"Wrote {len(records)} records to {args.output}")
+
+
+def compare(args) -> int:
+    """Prints every common record, returns the number of regressions."""
+    runs = []
+    for path in (args.old, args.new):
+        with open(path, "r") as f:
+            runs.append(
+                {
+                    (r["benchmark"], r["instance"]): r
+                    for r in json.load(f)["records"]
+                    if "skipped" not in r
+                }
+            )
+    old_records, new_records = runs
+
+    print(
+        f"{'benchmark':18} {'instance':22} {'old':>12} {'new':>12} {'change (%)':>11}"
+    )
+    regressions = 0
+    for key in sorted(old_records.keys() & new_records.keys()):
+        old, new = old_records[key]["value"], new_records[key]["value"]
+        if new_records[key]["higher_is_better"]:
+            old, new = new, old
+        change = (new - old) / old if old else 0.0
+        regressed = change > args.threshold
+        regressions += regressed
+        print(
+            f"{key[0]:18} {key[1]:22} {old_records[key]['value']:>12.6g} {new_records[key]['value']:>12.6g} {100 * change:>11.1f}"
+            + ("  REGRESSION" if regressed else "")
+        )
+
+    print(f"{regressions} regressions above {100 * args.threshold:.0f}%")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmarks")
+    run_parser.add_argument(
+        "--sizes",
+        type=lambda size: tuple(map(int, size.split("x"))),
+        nargs="+",
+        default=SIZE_CLASSES,
+        help="rows x columns, e.g. 60x10",
+    )
+    run_parser.add_argument("--instances", type=int, default=1, help="per size")
+    run_parser.add_argument(
+        "--benchmarks", nargs="+", choices=BENCHMARKS, default=list(BENCHMARKS)
+    )
+    run_parser.add_argument("--repeats", type=int, default=3)
+    run_parser.add_argument(
+        "--time-box", type=float, default=10, help="seconds per search or solve"
+    )
+    run_parser.add_argument(
+        "--max-heuristic-size",
+        type=int,
+        default=180,
+        help="passengers, larger instances skip everything built on the best heuristic",
+    )
+    run_parser.add_argument("--output", default=OUTPUT)
+
+    compare_parser = commands.add_parser("compare", help="flag regressions")
+    compare_parser.add_argument("old")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument(
+        "--threshold", type=float, default=0.2, help="relative change"
+    )
+
+    args = parser.parse_args()
+    best_known.enabled = False  # Every run starts from the heuristics alone
+    if args.command == "run":
+        run(args)
+    else:
+        sys.exit(1 if compare(args) else 0)
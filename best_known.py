@@ -0,0 +1,137 @@
+"""Best known ordering of every instance, shared by all runs.
+
+Orderings are keyed by the content hash of the instance's evaluator tables,
+so a synthetic instance or a copy of a ``data/mp_sp`` file finds the same
+entry. The store is off unless ``enabled`` is set, ``sim.py --best-known`` and
+``solve.py --best-known`` turn it on, offer every solution to ``update`` and
+then ``get_best_heuristic`` starts CP, MIP and LNS from the stored ordering
+and the local searches seed from it. On first use the orderings of the runs
+in ``results_store`` are imported.
+
+    python3 best_known.py    # every stored makespan
+"""
+
+import json
+import os
+import sqlite3
+import time
+
+import results_store
+
+DB_PATH = os.path.join(results_store.RESULTS_DIR, "best_known.db")
+# Off by default, stored orderings would make every run depend on the last
+enabled = False
+
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS best_known (
+        content_hash TEXT PRIMARY KEY,
+        makespan INTEGER NOT NULL,
+        ordering TEXT NOT NULL,
+        algorithm TEXT,
+        updated_at REAL NOT NULL
+    )""",
+    "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)",
+]
+
+
+def connect(path: str = DB_PATH) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, timeout=60)
+    conn.execute("PRAGMA journal_mode=WAL")
+    for statement in SCHEMA:
+        conn.execute(statement)
+    conn.commit()
+
+    if conn.execute("SELECT 1 FROM meta WHERE key = 'imported'").fetchone() is None:
+        conn.execute("BEGIN IMMEDIATE")
+        # Another process may have imported while this one waited for the lock
+        if conn.execute("SELECT 1 FROM meta WHERE key = 'imported'").fetchone() is None:
+            import_results(conn)
+            conn.execute("INSERT INTO meta VALUES ('imported', ?)", (str(time.time()),))
+        conn.commit()
+    return conn
+
+
+def _offer(
+    conn: sqlite3.Connection,
+    content_hash: str,
+    makespan: int,
+    ids: list[int],
+    algorithm,
+) -> bool:
+    cursor = conn.execute(
+        """INSERT INTO best_known VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT (content_hash) DO UPDATE SET makespan = excluded.makespan,
+            ordering = excluded.ordering, algorithm = excluded.algorithm,
+            updated_at = excluded.updated_at
+        WHERE excluded.makespan < best_known.makespan""",
+        (content_hash, makespan, json.dumps(ids), algorithm, time.time()),
+    )
+    return cursor.rowcount > 0
+
+
+def import_results(conn: sqlite3.Connection) -> int:
+    """Offers the ordering of every stored run, within the caller's transaction.
+
+    Orderings are simulated again, the objective values of CP runs are the
+    relaxation's rather than the simulated makespan.
+    """
+    from util import AirplaneBoardingProblem
+
+    results_conn = results_store.connect()
+    runs = results_conn.execute(
+        "SELECT num_rows, num_cols, test_number, algorithm, ordering FROM runs"
+    ).fetchall()
+    results_conn.close()
+
+    problems = {}
+    imported = 0
+    for num_rows, num_cols, test_number, algorithm, ordering in runs:
+        filepath = (num_rows, num_cols, test_number)
+        if filepath not in problems:
+            try:
+                problems[filepath] = AirplaneBoardingProblem(filepath)
+            except FileNotFoundError:
+                problems[filepath] = None
+        abp, ids = problems[filepath], json.loads(ordering)
+        if abp is None or sorted(ids) != list(range(abp.num_passengers)):
+            continue
+        evaluator = abp.evaluator
+        imported += _offer(
+            conn, evaluator.content_hash, evaluator.makespan(ids), ids, algorithm
+        )
+    return imported
+
+
+def lookup(abp) -> list[int] | None:
+    """Passenger ids of the best known ordering of ``abp``."""
+    if not enabled:
+        return None
+    conn = connect()
+    row = conn.execute(
+        "SELECT ordering FROM best_known WHERE content_hash = ?",
+        (abp.evaluator.content_hash,),
+    ).fetchone()
+    conn.close()
+    return row and json.loads(row[0])
+
+
+def update(abp, ids: list[int], algorithm: str | None = None) -> bool:
+    """Stores ``ids`` if it boards faster than the best known ordering."""
+    if not enabled or sorted(ids) != list(range(abp.num_passengers)):
+        return False
+    makespan = abp.evaluator.makespan(ids)
+    conn = connect()
+    with conn:
+        improved = _offer(conn, abp.evaluator.content_hash, makespan, ids, algorithm)
+    conn.close()
+    return improved
+
+
+if __name__ == "__main__":
+    conn = connect()
+    for content_hash, makespan, algorithm, updated_at in conn.execute(
+        "SELECT content_hash, makespan, algorithm, updated_at FROM best_known ORDER BY updated_at"
+    ):
+        print(
+            f"{content_hash[:16]} {makespan / 10:>10.1f} {algorithm or '-':20} {time.ctime(updated_at)}"
+        )
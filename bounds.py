@@ -0,0 +1,123 @@
+"""Valid lower bounds on the makespan, in discretised time units.
+
+Every bound relaxes the problem shared by the simulation, CP and MIP models:
+passenger ``p`` spends at least ``time_taken_at_row(p, r)`` in each row
+``r <= p.row`` in turn, and a row holds one passenger at a time. Unlike a
+heuristic run on a relaxed instance, no bound can exceed the optimum.
+"""
+
+import heapq
+
+import util
+from util import AirplaneBoardingProblem, discretise, time_taken_at_row
+
+
+def _row_jobs(abp: AirplaneBoardingProblem, r: int) -> list[tuple[int, int, int]]:
+    """(release, processing, tail) of everyone passing row ``r``.
+
+    Release is the earliest arrival at the row, tail the least time from
+    leaving the row to sitting down.
+    """
+    jobs = []
+    for p in abp.passengers:
+        if p.row < r:
+            continue
+        times = [time_taken_at_row(p, row) for row in range(1, p.row + 1)]
+        jobs.append((sum(times[: r - 1]), times[r - 1], sum(times[r:])))
+    return jobs
+
+
+def passenger_bound(abp: AirplaneBoardingProblem) -> int:
+    # Slowest passenger boarding an empty plane
+    return max(
+        sum(time_taken_at_row(p, r) for r in range(1, p.row + 1))
+        for p in abp.passengers
+    )
+
+
+def deepest_row_bound(abp: AirplaneBoardingProblem) -> int:
+    # Fastest path to the deepest seat, then everyone there settles in turn
+    jobs = _row_jobs(abp, abp.num_rows)
+    return min(release for release, _, _ in jobs) + sum(
+        processing for _, processing, _ in jobs
+    )
+
+
+def row_load_bound(abp: AirplaneBoardingProblem) -> int:
+    # Earliest arrival + everyone's time in the row + least time to a seat
+    return max(
+        min(release for release, _, _ in jobs)
+        + sum(processing for _, processing, _ in jobs)
+        + min(tail for _, _, tail in jobs)
+        for jobs in map(lambda r: _row_jobs(abp, r), abp.rows)
+    )
+
+
+def preemptive_schedule_bound(jobs: list[tuple[int, int, int]]) -> int:
+    """Optimal makespan of one machine with release times, tails and preemption.
+
+    Runs the available job with the largest tail (preemptive Jackson), which
+    is optimal for the preemptive problem and so bounds the real one.
+    """
+    jobs = sorted(jobs)
+    available, bound, t, k = [], 0, 0, 0
+    while k < len(jobs) or available:
+        if not available and t < jobs[k][0]:
+            t = jobs[k][0]
+        while k < len(jobs) and jobs[k][0] <= t:
+            release, processing, tail = jobs[k]
+            heapq.heappush(available, [-tail, processing])
+            k += 1
+
+        # Run the largest tail until it finishes or the next job is released
+        job = available[0]
+        until = jobs[k][0] if k < len(jobs) else float("inf")
+        run = min(job[1], until - t)
+        t += run
+        job[1] -= run
+        if job[1] == 0:
+            heapq.heappop(available)
+            bound = max(bound, t - job[0])
+
+    return bound
+
+
+def single_row_bound(abp: AirplaneBoardingProblem) -> int:
+    # Every row on its own is a one machine scheduling problem
+    return max(preemptive_schedule_bound(_row_jobs(abp, r)) for r in abp.rows)
+
+
+BOUNDS = {
+    "passenger": passenger_bound,
+    "deepest_row": deepest_row_bound,
+    "row_load": row_load_bound,
+    "single_row": single_row_bound,
+}
+
+
+def lower_bounds(abp: AirplaneBoardingProblem) -> dict[str, int]:
+    return {name: bound(abp) for name, bound in BOUNDS.items()}
+
+
+def lower_bound(abp: AirplaneBoardingProblem) -> int:
+    """Best of the lower bounds in ``BOUNDS``."""
+    return max(lower_bounds(abp).values())
+
+
+def print_bound_report(abp: AirplaneBoardingProblem, upper_bound: int):
+    """How much each bound shrinks the makespan domain [bound, upper_bound]."""
+    print(f"{'bound':12} {'value':>8} {'domain':>8} {'shrink (%)':>11}")
+    for name, bound in lower_bounds(abp).items():
+        domain = max(upper_bound - bound + 1, 0)
+        print(
+            f"{name:12} {bound / 10:>8.1f} {domain / 10:>8.1f} {100 * (1 - domain / (upper_bound + 1)):>11.2f}"
+        )
+
+
+if __name__ == "__main__":
+    from engines.heuristic_search import get_best_heuristic
+
+    abp = AirplaneBoardingProblem(util.CURRENT_ABP_PROBLEM)
+    upper_bound = discretise(get_best_heuristic(abp).makespan)
+    print(f"Upper bound (best heuristic): {upper_bound / 10}")
+    print_bound_report(abp, upper_bound)
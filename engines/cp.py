@@ -5,11 +5,16 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 
-import copy
+import itertools
+import json
+import threading
+import time
+from collections import defaultdict
 from ortools.sat.python import cp_model
+import bounds
+import profiling
 import util
-from engines import mip
-from engines.heuristic_search import get_best_heuristic
+from engines.heuristic_search import get_best_heuristic, multi_start_heuristic
 from util import (
     AbpSolver,
     AirplaneBoardingProblem,
@@ -22,19 +27,19 @@ from util import (
 
 
 def get_wait_times(abp: AirplaneBoardingProblem, sol: AbpSolution):
-    m, X, TF = mip.MIP.build_model(abp)
-    for i, p in enumerate(sol.ordering, start=1):
-        X[p, i].lb = 1
-
-    m.params.TimeLimit = TIME_LIMIT
-
-    m.optimize()
-
-    # Translate TF[i, r] to TF[p, r]
-    return {
-        (next(p for p in abp.passengers if round(X[p, i].x) == 1), r): discretise(v.x)
-        for (i, r), v in TF.items()
+    """``TF`` and ``W`` hints from simulating the boarding order of ``sol``.
+
+    ``TF[p, r]`` is when ``p`` leaves row ``r``, either entering row ``r + 1``
+    or sitting down, and ``W[p, r]`` is how long ``p`` spends in row ``r``.
+    Keyed by ``(p.id, r)`` like the model variables.
+    """
+    finish_times = sol.row_finish_times()
+    wait_times = {
+        (p.id, r): finish_times[p.id, r] - finish_times[p.id, r - 1]
+        for p in sol.ordering
+        for r in range(1, p.row)
     }
+    return finish_times, wait_times
 
 
 def earliest_finish_time_to_row(passenger: Passenger, row: int) -> int:
@@ -42,36 +47,190 @@ def earliest_finish_time_to_row(passenger: Passenger, row: int) -> int:
     return int(sum(time_taken_at_row(passenger, r) for r in range(1, row + 1)))
 
 
-def constant_move_times_per_passenger_abp(abp: AirplaneBoardingProblem):
-    slow_passengers = [
-        Passenger(
-            row=p.row,
-            column=p.column,
-            move_times=(min(move_time for move_time in p.move_times),)
-            * len(p.move_times),
-            settle_time=p.settle_time,
-            id=p.id,
+def canonical_ordering(abp: AirplaneBoardingProblem, ordering: list[Passenger]):
+    # Interchangeable passengers (same seat row, settle and move times) relabelled
+    # to board in id order, the makespan is unchanged.
+    profile_ids = abp.evaluator.profile_ids
+    interchangeable = defaultdict(list)
+    for p in sorted(ordering, key=lambda p: p.id):
+        interchangeable[profile_ids[p.id]].append(p)
+
+    relabel = {profile: iter(group) for profile, group in interchangeable.items()}
+    return [next(relabel[profile_ids[p.id]]) for p in ordering]
+
+
+def add_strong_constraints(
+    m: cp_model.CpModel,
+    abp: AirplaneBoardingProblem,
+    TF: dict,
+    W: dict,
+    CMax: cp_model.IntVar,
+    hint_ordering: list[Passenger],
+):
+    """Symmetry breaking, redundant constraints and a search strategy.
+
+    ``Before[p, q]`` (``p.id < q.id``) is true when ``p`` enters the aisle
+    before ``q``. Nobody overtakes in the aisle, so ``p`` also leaves the
+    deepest row both pass through before ``q`` enters it.
+    """
+    position = {p.id: i for i, p in enumerate(hint_ordering)}
+
+    Before = {}
+    for p, q in itertools.combinations(abp.passengers, 2):
+        before = m.new_bool_var(f"Before_{p.id},{q.id}")
+        m.add_hint(before, position[p.id] < position[q.id])
+        Before[p.id, q.id] = before
+
+        for first, second, literal in ((p, q, before), (q, p, before.Not())):
+            for r in {1, min(p.row, q.row)}:
+                m.add(TF[first.id, r] <= TF[second.id, r - 1]).only_enforce_if(literal)
+
+    # Interchangeable passengers board in id order
+    profile_ids = abp.evaluator.profile_ids
+    interchangeable = defaultdict(list)
+    for p in abp.passengers:
+        interchangeable[profile_ids[p.id]].append(p.id)
+    for group in interchangeable.values():
+        for p, q in zip(group, group[1:]):
+            m.add(Before[p, q] == 1)
+
+    # Everyone in row r passes through it one at a time, no earlier than the
+    # fastest arrival and leaving enough time for the quickest way to a seat.
+    for r in abp.rows:
+        passing = [p for p in abp.passengers if r <= p.row]
+        head = min(earliest_finish_time_to_row(p, r - 1) for p in passing)
+        tail = min(
+            earliest_finish_time_to_row(p, p.row) - earliest_finish_time_to_row(p, r)
+            for p in passing
+        )
+        m.add(
+            head
+            + sum(W[p.id, r] if r < p.row else p.settle_time for p in passing)
+            + tail
+            <= CMax
         )
-        for p in abp.passengers
-    ]
 
-    slow_abp = copy.copy(abp)
-    slow_abp.passengers = slow_passengers
-    return slow_abp
+    # Branch on the aisle entry order, earliest first
+    m.add_decision_strategy(
+        [TF[p.id, 0] for p in hint_ordering],
+        cp_model.CHOOSE_LOWEST_MIN,
+        cp_model.SELECT_MIN_VALUE,
+    )
+
+
+def jsonl_sink(path: str):
+    """Sink appending each incumbent to ``path`` as a line of JSON."""
+
+    def write(incumbent: dict):
+        with open(path, "a") as f:
+            f.write(json.dumps(incumbent) + "\n")
+
+    return write
+
+
+class IncumbentStream(cp_model.CpSolverSolutionCallback):
+    """Sends every improving solution of the CP model to ``sink``.
+
+    An incumbent is a dict of the solve's wall ``time``, ``makespan``, current
+    ``bound`` and the ``order`` of passenger ids, so an interrupted solve still
+    leaves its best ordering behind. ``sink`` is any callable taking the dict,
+    e.g. ``jsonl_sink(path)`` or ``queue.put``.
+    """
+
+    def __init__(
+        self,
+        TF: dict,
+        sink=None,
+        stagnation_window: float | None = None,
+        stop_event: threading.Event | None = None,
+    ):
+        super().__init__()
+        self.entry_times = [(p, TF[p, r]) for p, r in TF if r == 0]
+        self.sink = sink
+        self.stagnation_window = stagnation_window
+        self.stop_event = stop_event
+        self.last_improvement = time.monotonic()
+        self.incumbents = 0
+
+    def on_solution_callback(self):
+        self.last_improvement = time.monotonic()
+        self.incumbents += 1
+        if self.sink is None:
+            return
+
+        ordering = [
+            p for p, _ in sorted(self.entry_times, key=lambda item: self.value(item[1]))
+        ]
+        self.sink(
+            dict(
+                time=self.wall_time,
+                makespan=self.objective_value / 10,
+                bound=self.best_objective_bound / 10,
+                order=ordering,
+            )
+        )
+
+    def watch(self, solver: cp_model.CpSolver, done: threading.Event):
+        # Stops the search once no incumbent was found for stagnation_window,
+        # or as soon as the solve is cancelled through stop_event
+        while not done.wait(0.1):
+            if self.stop_event is not None and self.stop_event.is_set():
+                print("Solve cancelled, stopping")
+                solver.stop_search()
+                return
+            if (
+                self.stagnation_window is not None
+                and time.monotonic() - self.last_improvement > self.stagnation_window
+            ):
+                print(f"No improvement for {self.stagnation_window}s, stopping")
+                solver.stop_search()
+                return
 
 
 class CP(AbpSolver):
-    def solve_implementation(self, abp: AirplaneBoardingProblem) -> AbpSolution:
-        slow_abp: AirplaneBoardingProblem = constant_move_times_per_passenger_abp(abp)
+    threads = 8
+    strong = False  # Add symmetry breaking and redundant constraints
+    # Upper bound and hint from multi_start_heuristic on threads processes
+    multi_start = False
+    time_limit = TIME_LIMIT
+
+    # Anytime solving, stop early on (upper - lower) / upper <= relative_gap or
+    # after stagnation_window seconds without a better solution.
+    sink = None
+    relative_gap: float | None = None
+    stagnation_window: float | None = None
+
+    @staticmethod
+    def build_model(
+        abp: AirplaneBoardingProblem,
+        strong: bool = False,
+        multi_start_workers: int | None = None,
+    ) -> tuple[cp_model.CpModel, dict]:
+        with profiling.phase("upper_bound"):
+            if multi_start_workers is not None:
+                ub_solution, _ = multi_start_heuristic(
+                    abp, workers=multi_start_workers
+                )
+            else:
+                ub_solution: AbpSolution = get_best_heuristic(abp)
+        print(f"Upper bound solution of: {ub_solution.makespan}")
 
-        lb_solution = get_best_heuristic(slow_abp)
-        print(f"Lower bound solution of: {lb_solution.makespan}")
+        with profiling.phase("lower_bound"):
+            lower_bound = bounds.lower_bound(abp)
+        print(f"Lower bound of: {lower_bound / 10}")
+        bounds.print_bound_report(abp, discretise(ub_solution.makespan))
 
-        ub_solution: AbpSolution = get_best_heuristic(abp)
-        print(f"Upper bound solution of: {ub_solution.makespan}")
+        if strong:
+            # Hint must respect the symmetry breaking
+            ub_solution = AbpSolution(
+                abp, canonical_ordering(abp, ub_solution.ordering)
+            )
 
-        # Run MIP with best heuristic's boarding order to get finish times.
-        heuristic_finish_times = get_wait_times(abp, ub_solution)
+        # Simulate best heuristic's boarding order to get finish times.
+        with profiling.phase("hints"):
+            heuristic_finish_times, heuristic_wait_times = get_wait_times(
+                abp, ub_solution
+            )
 
         m = cp_model.CpModel()
 
@@ -79,14 +238,14 @@ class CP(AbpSolver):
 
         # Variables --------------------------------------
         CMax = m.new_int_var(
-            lb=discretise(lb_solution.makespan),
+            lb=lower_bound,
             ub=discretise(ub_solution.makespan),
             name="CMax",
         )
         m.add_hint(CMax, discretise(ub_solution.makespan))
 
         TF = {
-            (p, r): m.new_int_var(
+            (p.id, r): m.new_int_var(
                 lb=earliest_finish_time_to_row(p, r),
                 ub=discretise(ub_solution.makespan),
                 name=f"TF_({p.row},{p.column}),{r}",
@@ -96,11 +255,10 @@ class CP(AbpSolver):
             if r <= p.row
         }
         for p, r in TF:
-            if r > 0:
-                m.add_hint(TF[p, r], heuristic_finish_times[p, r])
+            m.add_hint(TF[p, r], heuristic_finish_times[p, r])
 
         W = {
-            (p, r): m.new_int_var(
+            (p.id, r): m.new_int_var(
                 lb=time_taken_at_row(p, r),
                 ub=discretise(ub_solution.makespan),
                 name=f"W_({p.row},{p.column}), {r}",
@@ -109,18 +267,14 @@ class CP(AbpSolver):
             for r in R0
             if r < p.row
         }
-        for p, r in W:
-            if r > 1:
-                m.add_hint(
-                    W[p, r],
-                    heuristic_finish_times[p, r] - heuristic_finish_times[p, r - 1],
-                )
+        for p, r in heuristic_wait_times:
+            m.add_hint(W[p, r], heuristic_wait_times[p, r])
 
         I = {
-            (p, r): m.new_interval_var(
-                start=TF[p, r - 1],
-                end=TF[p, r],
-                size=W[p, r] if r < p.row else p.settle_time,
+            (p.id, r): m.new_interval_var(
+                start=TF[p.id, r - 1],
+                end=TF[p.id, r],
+                size=W[p.id, r] if r < p.row else p.settle_time,
                 name=f"I_({p.row},{p.column}),{r}",
             )
             for p in abp.passengers
@@ -130,25 +284,59 @@ class CP(AbpSolver):
 
         # Subject to --------------------------------------
         NoOverlap = {
-            r: m.add_no_overlap(I[p, r] for p in abp.passengers if (p, r) in I)
+            r: m.add_no_overlap(I[p.id, r] for p in abp.passengers if r <= p.row)
             for r in abp.rows
         }
 
         SetMakeSpan = m.add_max_equality(CMax, TF.values())
 
+        if strong:
+            add_strong_constraints(m, abp, TF, W, CMax, ub_solution.ordering)
+
         # Objective --------------------------------------
         m.minimize(CMax)
 
+        profiling.record("variables", len(m.proto.variables))
+        profiling.record("constraints", len(m.proto.constraints))
+        return m, TF
+
+    def solve_implementation(self, abp: AirplaneBoardingProblem) -> AbpSolution:
+        with profiling.phase("build"):
+            m, TF = self.build_model(
+                abp, self.strong, self.threads if self.multi_start else None
+            )
+
         # Result --------------------------------------
         solver = cp_model.CpSolver()
         solver.parameters.linearization_level = 0  # no_lp
+        if self.strong:
+            # Probing every Before literal takes longer than it saves
+            solver.parameters.cp_model_probing_level = 0
         solver.parameters.log_search_progress = True
-        solver.parameters.num_workers = 8
-        solver.parameters.max_time_in_seconds = TIME_LIMIT
-        status = solver.solve(m)
+        solver.parameters.num_workers = self.threads
+        solver.parameters.max_time_in_seconds = self.time_limit
+        if self.relative_gap is not None:
+            solver.parameters.relative_gap_limit = self.relative_gap
+
+        stream = IncumbentStream(TF, self.sink, self.stagnation_window, self.stop_event)
+        done = threading.Event()
+        if self.stagnation_window is not None or self.stop_event is not None:
+            threading.Thread(target=stream.watch, args=(solver, done)).start()
+        try:
+            with profiling.phase("search"):
+                status = solver.solve(m, stream)
+        finally:
+            done.set()
+        profiling.record("branches", solver.num_branches)
+        profiling.record("conflicts", solver.num_conflicts)
+
+        if status not in [cp_model.OPTIMAL, cp_model.FEASIBLE]:
+            # Cancelled or out of time before the first solution, use the hint
+            print("No CP solution found, returning the best heuristic")
+            return get_best_heuristic(abp)
 
         result = [
-            p
+            abp.passengers[p]
             for (p, r), time in sorted(
                 TF.items(), key=lambda item: solver.value(item[1])
             )
@@ -159,16 +347,16 @@ class CP(AbpSolver):
         return AbpSolution(
             abp,
             result,
-            makespan=(
-                solver.value(CMax)
-                if status in [cp_model.OPTIMAL, cp_model.FEASIBLE]
-                else "N/A"
-            ),
+            makespan=solver.objective_value,
             finish_times=finish_times,
             range_=(solver.best_objective_bound / 10, solver.objective_value / 10),
         )
 
 
+class StrongCP(CP):
+    strong = True
+
+
 if __name__ == "__main__":
     abp = AirplaneBoardingProblem(util.CURRENT_ABP_PROBLEM)
     cp_solver = CP()
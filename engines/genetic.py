@@ -0,0 +1,265 @@
+# Hack import trick for relative imports
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import functools
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import best_known
+import profiling
+import util
+from engines.max_settle_row import MaxSettleRow
+from engines.outside_in_btf import OutsideInBTF
+from util import AbpSolver, AirplaneBoardingProblem, AbpSolution
+
+
+def _cut_points(rng: np.random.Generator, num_children: int, length: int):
+    cuts = np.sort(rng.integers(length + 1, size=(num_children, 2)), axis=1)
+    return cuts[:, :1], cuts[:, 1:]
+
+
+def order_crossover(
+    parents_a: np.ndarray, parents_b: np.ndarray, rng: np.random.Generator
+) -> np.ndarray:
+    """OX: a random slice of ``parents_a``, the rest in the order of ``parents_b``."""
+    num_children, length = parents_a.shape
+    lo, hi = _cut_points(rng, num_children, length)
+    positions = np.arange(length)
+    in_slice = (positions >= lo) & (positions < hi)
+
+    # Genes of b that are not in a's slice, in b's order, go to the positions
+    # outside the slice from left to right.
+    taken = np.zeros_like(in_slice)
+    np.put_along_axis(taken, parents_a, in_slice, axis=1)
+    kept = np.take_along_axis(
+        parents_b,
+        np.argsort(
+            taken[np.arange(num_children)[:, None], parents_b], axis=1, kind="stable"
+        ),
+        axis=1,
+    )
+    outside = np.argsort(in_slice, axis=1, kind="stable")
+
+    num_outside = length - (hi - lo)
+    values = np.where(
+        positions < num_outside, kept, np.take_along_axis(parents_a, outside, axis=1)
+    )
+    children = parents_a.copy()
+    np.put_along_axis(children, outside, values, axis=1)
+    return children
+
+
+def partially_mapped_crossover(
+    parents_a: np.ndarray, parents_b: np.ndarray, rng: np.random.Generator
+) -> np.ndarray:
+    """PMX: a random slice of ``parents_a``, conflicts mapped through the slice."""
+    num_children, length = parents_a.shape
+    lo, hi = _cut_points(rng, num_children, length)
+
+    children = parents_b.copy()
+    for child, a, b, l, h in zip(children, parents_a, parents_b, lo[:, 0], hi[:, 0]):
+        position_in_b = np.argsort(b)
+        in_slice = np.zeros(length, dtype=bool)
+        in_slice[a[l:h]] = True
+        child[l:h] = a[l:h]
+        for i in range(l, h):
+            gene = b[i]
+            if in_slice[gene]:
+                continue
+            # Follow the mapping until it leaves the slice
+            position = i
+            while l <= position < h:
+                position = position_in_b[a[position]]
+            child[position] = gene
+    return children
+
+
+CROSSOVERS = {"ox": order_crossover, "pmx": partially_mapped_crossover}
+
+
+def mutate(population: np.ndarray, rate: float, rng: np.random.Generator):
+    """Swap two positions or move one passenger, each with probability ``rate``."""
+    num_orderings, length = population.shape
+    i, j = rng.integers(length, size=(2, num_orderings))
+
+    swap = np.flatnonzero(rng.random(num_orderings) < rate)
+    population[swap, i[swap]], population[swap, j[swap]] = (
+        population[swap, j[swap]],
+        population[swap, i[swap]],
+    )
+
+    for k in np.flatnonzero(rng.random(num_orderings) < rate):
+        population[k] = np.insert(
+            np.delete(population[k], i[k]), j[k], population[k, i[k]]
+        )
+
+
+def evolve(
+    abp: AirplaneBoardingProblem,
+    population: np.ndarray,
+    generations: int,
+    seed: int,
+    deadline: float | None = None,
+    crossover: str = "ox",
+    mutation_rate: float = 0.2,
+    elite: int = 4,
+    tournament: int = 3,
+) -> tuple[np.ndarray, np.ndarray, int]:
+    """Evolves one island, every generation scored by a single batch call.
+
+    Returns the final population, its makespans and the generations run.
+    """
+    rng = np.random.default_rng(seed)
+    evaluator = abp.evaluator
+    makespans = evaluator.batch_makespans(population)
+    num_children = len(population) - elite
+
+    generation = 0
+    while generation < generations:
+        if deadline is not None and time.time() > deadline:
+            break
+        generation += 1
+
+        # Tournament selection of both parents
+        contestants = rng.integers(len(population), size=(2, num_children, tournament))
+        winners = np.take_along_axis(
+            contestants, makespans[contestants].argmin(axis=2)[..., None], axis=2
+        )[..., 0]
+        children = CROSSOVERS[crossover](
+            population[winners[0]], population[winners[1]], rng
+        )
+        mutate(children, mutation_rate, rng)
+
+        best = np.argsort(makespans)[:elite]
+        population = np.concatenate([population[best], children])
+        makespans = np.concatenate(
+            [makespans[best], evaluator.batch_makespans(children)]
+        )
+
+    return population, makespans, generation
+
+
+class Genetic(AbpSolver):
+    """Genetic algorithm over boarding orders.
+
+    Populations are seeded with ``MaxSettleRow``, ``OutsideInBTF``, the best
+    known ordering and random orderings. Each generation keeps the ``elite`` best, breeds the rest by
+    tournament selection, OX or PMX crossover and swap/insert mutation, and
+    scores the children with one ``BoardingEvaluator.batch_makespans`` call.
+    With ``islands > 1`` each island evolves on its own process and every
+    ``migration_interval`` generations the best ``migrants`` of each island
+    replace the worst of the next one.
+    """
+
+    def __init__(
+        self,
+        population_size: int = 256,
+        generations: int = 500,
+        time_limit: float | None = None,
+        crossover: str = "ox",
+        mutation_rate: float = 0.2,
+        elite: int = 4,
+        tournament: int = 3,
+        islands: int = 1,
+        migration_interval: int = 25,
+        migrants: int = 4,
+        seed: int | None = None,
+    ):
+        assert crossover in CROSSOVERS, f"Unknown crossover {crossover}."
+        self.population_size = population_size
+        self.generations = generations
+        self.time_limit = time_limit
+        self.crossover = crossover
+        self.mutation_rate = mutation_rate
+        self.elite = elite
+        self.tournament = tournament
+        self.islands = islands
+        self.migration_interval = migration_interval
+        self.migrants = migrants
+        self.seed = seed
+        self.threads = islands
+
+    def initial_population(
+        self, abp: AirplaneBoardingProblem, rng: np.random.Generator
+    ) -> np.ndarray:
+        seeds = [
+            [p.id for p in Heuristic().solve(abp).ordering]
+            for Heuristic in [MaxSettleRow, OutsideInBTF]
+        ]
+        stored = best_known.lookup(abp)
+        if stored is not None:
+            seeds.append(stored)
+        population = rng.permuted(
+            np.tile(np.arange(abp.num_passengers), (self.population_size, 1)), axis=1
+        )
+        population[: len(seeds)] = seeds
+        return population
+
+    def solve_implementation(self, abp: AirplaneBoardingProblem) -> AbpSolution:
+        rng = np.random.default_rng(self.seed)
+        deadline = time.time() + self.time_limit if self.time_limit else None
+        run_island = functools.partial(
+            evolve,
+            deadline=deadline,
+            crossover=self.crossover,
+            mutation_rate=self.mutation_rate,
+            elite=self.elite,
+            tournament=self.tournament,
+        )
+
+        populations = [self.initial_population(abp, rng) for _ in range(self.islands)]
+        makespans = [abp.evaluator.batch_makespans(p) for p in populations]
+        generation = 0
+        with ProcessPoolExecutor(max_workers=self.islands) as pool:
+            island_map = pool.map if self.islands > 1 else map
+            while (
+                generation < self.generations
+                and (deadline is None or time.time() < deadline)
+                and not self.stopped()
+            ):
+                epoch = min(self.migration_interval, self.generations - generation)
+                seeds = rng.integers(2**63, size=self.islands).tolist()
+                results = list(
+                    island_map(
+                        run_island,
+                        [abp] * self.islands,
+                        populations,
+                        [epoch] * self.islands,
+                        seeds,
+                    )
+                )
+                generation += max(generations for _, _, generations in results)
+                populations = [population for population, _, _ in results]
+                makespans = [island_makespans for _, island_makespans, _ in results]
+
+                # Ring migration, the best of island k replace the worst of k + 1
+                if self.islands > 1:
+                    migrants = [
+                        (populations[k][best], makespans[k][best])
+                        for k, best in enumerate(
+                            np.argsort(m)[: self.migrants] for m in makespans
+                        )
+                    ]
+                    for k, (population, island_makespans) in enumerate(migrants):
+                        target = (k + 1) % self.islands
+                        worst = np.argsort(makespans[target])[-self.migrants :]
+                        populations[target][worst] = population
+                        makespans[target][worst] = island_makespans
+
+        profiling.count("generations", generation)
+        island = min(range(self.islands), key=lambda k: makespans[k].min())
+        best = makespans[island].argmin()
+        result = [abp.passengers[i] for i in populations[island][best]]
+        return AbpSolution(abp, result, makespan=int(makespans[island][best]))
+
+
+if __name__ == "__main__":
+    abp = AirplaneBoardingProblem(util.CURRENT_ABP_PROBLEM)
+    genetic_solver = Genetic(islands=4)
+    solution = genetic_solver.solve(abp)
+    solution.visualise_solution()
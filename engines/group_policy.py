@@ -0,0 +1,161 @@
+# Hack import trick for relative imports
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import time
+
+import numpy as np
+
+import profiling
+import util
+from engines.max_settle_row import MaxSettleRow
+from util import AbpSolver, AirplaneBoardingProblem, AbpSolution
+
+
+def travel_units(abp: AirplaneBoardingProblem) -> np.ndarray:
+    """Unit of every passenger, a ``pax_groups`` travel group or themselves."""
+    units = abp.pax_group.astype(np.int64)
+    alone = units < 0
+    units[alone] = units.max(initial=-1) + 1 + np.arange(alone.sum())
+    return units
+
+
+class GroupPolicy(AbpSolver):
+    """Boarding zones called at the gate, rather than a passenger ordering.
+
+    Travel groups board together. A policy gives every unit (a travel group or
+    a passenger travelling alone) one of ``num_zones`` zones, which board one
+    after the other with their units, and the passengers within a unit, in a
+    random order. ``num_zones=None`` gives every unit its own zone, so the
+    policy is an order of the units.
+
+    Policies are scored by their mean makespan over ``num_samples`` sampled
+    boardings. Hill climbing from the zones of the ``MaxSettleRow`` ordering
+    scores ``num_candidates`` moves per iteration (swapping the zones of two
+    units or moving a unit to another zone) on the same samples, in a single
+    ``BoardingEvaluator.batch_makespans`` call. The best policy is scored
+    again on ``num_final_samples`` fresh samples, and the sampled ordering with
+    the median makespan is returned.
+    """
+
+    def __init__(
+        self,
+        num_zones: int | None = 6,
+        time_limit: float = 60,
+        seed: int | None = None,
+        num_samples: int = 64,
+        num_candidates: int = 16,
+        num_final_samples: int = 1000,
+        swap_probability: float = 0.5,
+    ):
+        self.num_zones = num_zones
+        self.time_limit = time_limit
+        self.seed = seed
+        self.num_samples = num_samples
+        self.num_candidates = num_candidates
+        self.num_final_samples = num_final_samples
+        self.swap_probability = swap_probability
+
+        self.iterations = 0
+        # Passenger ids of every zone, in boarding order, and the mean makespan
+        self.zones: list[list[int]] = []
+        self.expected_makespan: float | None = None
+
+    def initial_zones(self, abp: AirplaneBoardingProblem, units: np.ndarray):
+        # Units ranked by their first passenger in MaxSettleRow, cut evenly
+        first_position = np.full(units.max() + 1, abp.num_passengers)
+        for position, p in enumerate(MaxSettleRow().solve(abp).ordering):
+            first_position[units[p.id]] = min(first_position[units[p.id]], position)
+        rank = np.argsort(np.argsort(first_position, kind="stable"))
+        if self.num_zones is None:
+            return rank
+        return rank * self.num_zones // len(rank)
+
+    @staticmethod
+    def sample_keys(rng: np.random.Generator, num_units: int, num_samples: int, units):
+        """Random order of the units and of the passengers within each unit."""
+        unit_rank = rng.permuted(
+            np.tile(np.arange(num_units), (num_samples, 1)), axis=1
+        )
+        return unit_rank[:, units] + rng.random((num_samples, len(units)))
+
+    @staticmethod
+    def orderings(zones: np.ndarray, keys: np.ndarray, units: np.ndarray):
+        """Boardings of every policy in ``zones`` (M x U) for each sample of ``keys``."""
+        num_units = zones.shape[1]
+        boarding_keys = zones[:, None, units] * num_units + keys[None]
+        return np.argsort(boarding_keys.reshape(-1, len(units)), axis=1)
+
+    def solve_implementation(self, abp: AirplaneBoardingProblem) -> AbpSolution:
+        rng = np.random.default_rng(self.seed)
+        evaluator = abp.evaluator
+        units = travel_units(abp)
+        num_units = units.max() + 1
+        num_zones = self.num_zones or num_units
+
+        def expected_makespans(zones: np.ndarray, keys: np.ndarray) -> np.ndarray:
+            makespans = evaluator.batch_makespans(self.orderings(zones, keys, units))
+            return makespans.reshape(len(zones), -1).mean(axis=1)
+
+        # Every candidate is scored on the same samples, so differences between
+        # them are not sampling noise
+        keys = self.sample_keys(rng, num_units, self.num_samples, units)
+        zones = self.initial_zones(abp, units)
+        expected = expected_makespans(zones[None], keys)[0]
+
+        self.iterations = 0
+        candidates = np.arange(self.num_candidates)
+        start = time.time()
+        while time.time() - start < self.time_limit and not self.stopped():
+            moved = np.tile(zones, (self.num_candidates, 1))
+            a = rng.integers(num_units, size=self.num_candidates)
+            swap = np.ones(self.num_candidates, dtype=bool)
+            if self.num_zones is not None:
+                # The other candidates move unit a alone to a random zone, the
+                # only move there is with a single unit
+                swap = rng.random(self.num_candidates) < self.swap_probability
+                swap &= num_units > 1
+                reassign = candidates[~swap]
+                moved[reassign, a[~swap]] = rng.integers(num_zones, size=len(reassign))
+            if num_units > 1:
+                # b is never a, swapping a unit with itself wastes an evaluation
+                swapped, a = candidates[swap], a[swap]
+                b = (a + rng.integers(1, num_units, size=len(a))) % num_units
+                moved[swapped, a], moved[swapped, b] = zones[b], zones[a]
+
+            makespans = expected_makespans(moved, keys)
+            k = makespans.argmin()
+            if makespans[k] <= expected:
+                zones, expected = moved[k], makespans[k]
+            self.iterations += 1
+
+        profiling.count("iterations", self.iterations)
+        profiling.count("policies_evaluated", self.iterations * self.num_candidates)
+        print(
+            f"GroupPolicy: {self.iterations} iterations, "
+            f"expected makespan {expected / 10:.1f} on the search samples"
+        )
+
+        final_keys = self.sample_keys(rng, num_units, self.num_final_samples, units)
+        samples = self.orderings(zones[None], final_keys, units)
+        makespans = evaluator.batch_makespans(samples)
+        self.expected_makespan = makespans.mean() / 10
+        median = samples[np.argsort(makespans)[len(makespans) // 2]]
+
+        self.zones = []
+        for zone in np.unique(zones):
+            in_zone = zones[units[median]] == zone
+            self.zones.append(median[in_zone].tolist())
+
+        return AbpSolution(abp, [abp.passengers[i] for i in median])
+
+
+if __name__ == "__main__":
+    abp = AirplaneBoardingProblem(util.CURRENT_ABP_PROBLEM)
+    policy_solver = GroupPolicy()
+    solution = policy_solver.solve(abp)
+    print(f"Expected makespan {policy_solver.expected_makespan:.1f}")
+    for zone, ids in enumerate(policy_solver.zones, 1):
+        print(f"Zone {zone}: {ids}")
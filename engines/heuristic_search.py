@@ -1,18 +1,138 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import best_known
 from engines.max_settle_row import MaxSettleRow
 from engines.outside_in_btf import OutsideInBTF
 from engines.random_ordering import Random
 from engines.two_opt_search import two_opt_search
-from util import AirplaneBoardingProblem, Passenger, AbpSolution
+from util import AirplaneBoardingProblem, AbpSolution, AbpSolver
+
+CACHE_SIZE = 128  # Improved starts kept, least recently used are evicted
+
+# (instance content hash, heuristic, heuristic config) -> 2-opt ordering ids
+_two_opt_cache: OrderedDict[tuple, list[int]] = OrderedDict()
+_two_opt_cache_lock = threading.Lock()  # Solve service threads share the cache
+
+
+def _cached_two_opt_start(
+    abp: AirplaneBoardingProblem, heuristic: AbpSolver
+) -> list[int]:
+    key = (
+        abp.evaluator.content_hash,
+        type(heuristic).__name__,
+        tuple(sorted(vars(heuristic).items())),
+    )
+    with _two_opt_cache_lock:
+        if key in _two_opt_cache:
+            _two_opt_cache.move_to_end(key)
+            return _two_opt_cache[key]
+
+    heuristic_solution: AbpSolution = heuristic.solve(abp)
+    two_opt_sol: AbpSolution = two_opt_search(abp, heuristic_solution)
+    ids = [p.id for p in two_opt_sol.ordering]
+    with _two_opt_cache_lock:
+        _two_opt_cache[key] = ids
+        if len(_two_opt_cache) > CACHE_SIZE:
+            _two_opt_cache.popitem(last=False)
+    return ids
 
 
 def get_best_heuristic(abp: AirplaneBoardingProblem) -> AbpSolution:
+    # Solvers call this repeatedly on the same instances, every heuristic and
+    # its 2-opt run only happens once per instance content. A stored best known
+    # ordering wins when it is better, so CP, MIP and LNS start from it.
     makespan: float = float("inf")
     solution: AbpSolution = ...
 
     for Heuristic in [MaxSettleRow, OutsideInBTF, Random]:
-        heuristic_solution: AbpSolution = Heuristic().solve(abp)
-        two_opt_sol: AbpSolution = two_opt_search(abp, heuristic_solution)
+        ids = _cached_two_opt_start(abp, Heuristic())
+        two_opt_sol = AbpSolution(abp, [abp.passengers[i] for i in ids])
         if two_opt_sol.makespan < makespan:
             makespan, solution = two_opt_sol.makespan, two_opt_sol
 
+    return best_known_or(abp, solution)
+
+
+def best_known_or(abp: AirplaneBoardingProblem, solution: AbpSolution) -> AbpSolution:
+    """``solution``, or the stored best known ordering when it boards faster."""
+    ids = best_known.lookup(abp)
+    if ids is not None:
+        stored = AbpSolution(abp, [abp.passengers[i] for i in ids])
+        if stored.makespan < solution.makespan:
+            return stored
     return solution
+
+
+class BestHeuristic(AbpSolver):
+    """``get_best_heuristic`` as a solver."""
+
+    def solve_implementation(self, abp: AirplaneBoardingProblem) -> AbpSolution:
+        return get_best_heuristic(abp)
+
+
+def _run_start(
+    abp: AirplaneBoardingProblem,
+    heuristic: AbpSolver,
+    deadline: float | None,
+    skippable: bool = True,
+) -> tuple[list[int], dict] | None:
+    # Starts that only get a worker after the budget ran out are skipped,
+    # bar the first so there is always a solution
+    if skippable and deadline is not None and time.time() > deadline:
+        return None
+
+    start = time.time()
+    heuristic_solution = heuristic.solve(abp)
+    stats = {}
+    two_opt_sol = two_opt_search(
+        abp, heuristic_solution, stats=stats, deadline=deadline
+    )
+    return [p.id for p in two_opt_sol.ordering], dict(
+        start=type(heuristic).__name__,
+        seed=getattr(heuristic, "seed", None),
+        heuristic_makespan=heuristic_solution.makespan,
+        makespan=two_opt_sol.makespan,
+        computation_time=time.time() - start,
+        **stats,
+    )
+
+
+def multi_start_heuristic(
+    abp: AirplaneBoardingProblem,
+    num_random_starts: int = 8,
+    workers: int | None = None,
+    time_limit: float | None = None,
+    seed: int = 0,
+) -> tuple[AbpSolution, list[dict]]:
+    """Parallel ``get_best_heuristic`` with extra seeded ``Random`` starts.
+
+    Every start is followed by 2-opt on its own worker process, stopping at
+    ``time_limit`` seconds with the best ordering found so far. The first
+    start always runs, even past the limit. Returns the best solution, the
+    stored best known ordering when it is better, and the statistics of every
+    start that ran.
+    """
+    starts = [MaxSettleRow(), OutsideInBTF()] + [
+        Random(seed=seed + k) for k in range(num_random_starts + 1)
+    ]
+    deadline = time.time() + time_limit if time_limit is not None else None
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = [
+            result
+            for result in pool.map(
+                _run_start,
+                [abp] * len(starts),
+                starts,
+                [deadline] * len(starts),
+                [k > 0 for k in range(len(starts))],
+            )
+            if result is not None
+        ]
+
+    best_ids, _ = min(results, key=lambda result: result[1]["makespan"])
+    solution = AbpSolution(abp, [abp.passengers[i] for i in best_ids])
+    return best_known_or(abp, solution), [stats for _, stats in results]
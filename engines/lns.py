@@ -0,0 +1,254 @@
+# Hack import trick for relative imports
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+import collections
+import time
+import numpy as np
+from ortools.sat.python import cp_model
+import bounds
+import profiling
+from evaluator import NO_PATH
+import util
+from engines.heuristic_search import best_known_or
+from engines.max_settle_row import MaxSettleRow
+from engines.two_opt_search import two_opt_search
+from util import (
+    AbpSolver,
+    AirplaneBoardingProblem,
+    AbpSolution,
+    time_taken_at_row,
+    TIME_LIMIT,
+)
+
+MIN_NEIGHBOURHOOD = 4
+NEIGHBOURHOODS = ["window", "random"]
+
+
+def build_submodel(
+    abp: AirplaneBoardingProblem,
+    ids: list[int],
+    start: int,
+    end: int,
+    free: set[int],
+    state: tuple,
+    tail: np.ndarray,
+    upper_bound: int,
+    lower_bound: int = 0,
+) -> tuple[cp_model.CpModel, dict]:
+    """CP model re-ordering the segment ``ids[start:end]`` of an ordering.
+
+    ``state`` is the evaluator state (row blockages, makespan) after
+    ``ids[:start]`` and ``tail`` the tail weights ``w[end]`` of the rest of
+    the ordering (see ``BoardingEvaluator.tail_weights``). Passengers at
+    positions in ``free`` can board anywhere in the segment, the others keep
+    their relative order. The objective is the makespan of the whole ordering,
+    so ``lower_bound`` can be any bound on it.
+    """
+    row_blockage, prefix_makespan = state
+    segment = [abp.passengers[i] for i in ids[start:end]]
+    move_into_row = abp.evaluator.move_into_row
+
+    m = cp_model.CpModel()
+    Makespan = m.new_int_var(
+        max(prefix_makespan, lower_bound), upper_bound, "Makespan"
+    )
+
+    TF, I = {}, {}
+    for p in segment:
+        # Row r is only free once the prefix has left it at row_blockage[r]
+        for r in range(p.row + 1):
+            lb = row_blockage[r + 1] if r < p.row else 0
+            if r == 0:
+                lb = max(lb, row_blockage[0] + move_into_row[p.id, 1])
+            TF[p.id, r] = m.new_int_var(lb, upper_bound, f"TF_{p.id},{r}")
+
+        # Reaching row 1 takes the move from the previous passenger's entry
+        I[p.id, 0] = m.new_fixed_size_interval_var(
+            TF[p.id, 0] - move_into_row[p.id, 1],
+            move_into_row[p.id, 1],
+            f"I_{p.id},0",
+        )
+        for r in abp.rows:
+            if r > p.row:
+                break
+            size = (
+                m.new_int_var(time_taken_at_row(p, r), upper_bound, f"W_{p.id},{r}")
+                if r < p.row
+                else p.settle_time
+            )
+            I[p.id, r] = m.new_interval_var(
+                TF[p.id, r - 1], size, TF[p.id, r], f"I_{p.id},{r}"
+            )
+
+    for r in range(abp.num_rows + 1):
+        m.add_no_overlap(I[p.id, r] for p in segment if r <= p.row)
+
+    # Passengers that are not freed keep their order
+    fixed = [ids[i] for i in range(start, end) if i not in free]
+    for a, b in zip(fixed, fixed[1:]):
+        m.add(TF[a, 1] <= TF[b, 0])
+
+    # Boarding is max-plus linear, the rest of the ordering finishes at
+    # max(tail[r] + the time the segment frees row r)
+    makespans = [TF[p.id, p.row] for p in segment] + [prefix_makespan]
+    for r in range(abp.num_rows + 1):
+        if tail[r] == NO_PATH:
+            continue
+        Free = m.new_int_var(row_blockage[r], upper_bound, f"Free_{r}")
+        m.add_max_equality(
+            Free, [TF[p.id, r] for p in segment if r <= p.row] + [row_blockage[r]]
+        )
+        makespans.append(Free + int(tail[r]))
+    m.add_max_equality(Makespan, makespans)
+    m.minimize(Makespan)
+
+    m.add_decision_strategy(
+        [TF[p.id, 0] for p in segment],
+        cp_model.CHOOSE_LOWEST_MIN,
+        cp_model.SELECT_MIN_VALUE,
+    )
+
+    # Hint the current ordering
+    enter_times = abp.evaluator.enter_times(ids[:end])[start:]
+    for p, enter_row in zip(segment, enter_times):
+        for r in range(p.row):
+            m.add_hint(TF[p.id, r], enter_row[r + 1])
+        m.add_hint(TF[p.id, p.row], enter_row[p.row] + p.settle_time)
+
+    return m, TF
+
+
+class LNS(AbpSolver):
+    """Large neighbourhood search over the boarding order with CP-SAT.
+
+    Starting from ``MaxSettleRow`` improved by 2-opt for ``start_fraction``
+    of ``time_limit`` (or the best known ordering when it is better), each
+    iteration frees either a window of consecutive positions or a random
+    subset of positions in a segment of the ordering and re-optimises them
+    with a CP model of the segment, whose objective is the makespan of the
+    whole ordering. The neighbourhood grows once ``stagnation_window``
+    sub-models in a row did not improve and shrinks when one times out.
+    """
+
+    threads = 8  # CP-SAT workers of every sub-model
+    time_limit = TIME_LIMIT
+    sub_time_limit = 0.5  # Per sub-model
+    # Sub-models without an improvement before the neighbourhood grows
+    stagnation_window = 5
+    # Most of time_limit the 2-opt start may take, at 300 passengers 2-opt
+    # runs for minutes and get_best_heuristic for hours
+    start_fraction = 0.5
+
+    def __init__(
+        self,
+        neighbourhood_size: int = 8,
+        seed: int | None = None,
+        sink=None,
+    ):
+        self.neighbourhood_size = neighbourhood_size
+        self.seed = seed
+        # Called with dict(time, makespan, order) on every improvement, times
+        # are from the start of the solve like the incumbents of CP.sink
+        self.sink = sink
+        self.history: list[tuple[float, float]] = []
+
+    def solve_implementation(self, abp: AirplaneBoardingProblem) -> AbpSolution:
+        rng = np.random.default_rng(self.seed)
+        evaluator = abp.evaluator
+
+        start_time = time.time()
+        deadline = start_time + self.time_limit
+        with profiling.phase("upper_bound"):
+            ids = [p.id for p in self.start(abp, start_time).ordering]
+        makespan = evaluator.makespan(ids)
+        self._record(start_time, makespan, ids)
+        with profiling.phase("lower_bound"):
+            lower_bound = bounds.lower_bound(abp)
+
+        num_passengers = len(ids)
+        k = min(self.neighbourhood_size, num_passengers)
+        recent = collections.deque(maxlen=self.stagnation_window)
+        while time.time() < deadline and not self.stopped():
+            # A window of k positions, or k random positions in a segment of
+            # twice that
+            window = rng.choice(NEIGHBOURHOODS) == "window"
+            length = min(num_passengers, k if window else 2 * k)
+            start = int(rng.integers(num_passengers - length + 1))
+            if window:
+                free = set(range(start, start + length))
+            else:
+                free = set(rng.choice(range(start, start + length), k, False).tolist())
+            end = start + length
+
+            with profiling.phase("build"):
+                m, TF = build_submodel(
+                    abp,
+                    ids,
+                    start,
+                    end,
+                    free,
+                    evaluator.prefix_states(ids[:start])[-1],
+                    evaluator.tail_weights(ids, end)[0],
+                    makespan,
+                    lower_bound,
+                )
+
+            solver = cp_model.CpSolver()
+            solver.parameters.num_workers = self.threads
+            solver.parameters.max_time_in_seconds = min(
+                self.sub_time_limit, max(deadline - time.time(), 0.01)
+            )
+            with profiling.phase("search"):
+                status = solver.solve(m)
+            profiling.count("submodels")
+
+            improved = False
+            if status in [cp_model.OPTIMAL, cp_model.FEASIBLE]:
+                segment = sorted(
+                    ids[start:end], key=lambda p: (solver.value(TF[p, 0]), p)
+                )
+                candidate = ids[:start] + segment + ids[end:]
+                candidate_makespan = evaluator.makespan(candidate)
+                if candidate_makespan <= makespan:
+                    improved = candidate_makespan < makespan
+                    ids, makespan = candidate, candidate_makespan
+                    if improved:
+                        self._record(start_time, makespan, ids)
+
+            # Shrink the neighbourhood when a sub-model times out without
+            # improving, grow it once the recent sub-models stop improving
+            recent.append(improved)
+            if status != cp_model.OPTIMAL and not improved:
+                k = max(k - 1, MIN_NEIGHBOURHOOD)
+            elif len(recent) == recent.maxlen and not any(recent):
+                k = min(k + 1, num_passengers)
+                recent.clear()
+
+        return AbpSolution(abp, [abp.passengers[i] for i in ids], makespan=makespan)
+
+    def start(self, abp: AirplaneBoardingProblem, start_time: float) -> AbpSolution:
+        solution = two_opt_search(
+            abp,
+            MaxSettleRow().solve(abp),
+            deadline=start_time + self.start_fraction * self.time_limit,
+        )
+        return best_known_or(abp, solution)
+
+    def _record(self, start_time: float, makespan: int, ids: list[int]):
+        elapsed = time.time() - start_time
+        self.history.append((elapsed, makespan / 10))
+        print(f"LNS {elapsed:8.2f}s makespan {makespan / 10}")
+        if self.sink is not None:
+            self.sink(dict(time=elapsed, makespan=makespan / 10, order=list(ids)))
+
+
+if __name__ == "__main__":
+    abp = AirplaneBoardingProblem(util.CURRENT_ABP_PROBLEM)
+    lns_solver = LNS()
+
+    lns_solution = lns_solver.solve(abp)
+    lns_solution.visualise_solution()
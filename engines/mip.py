@@ -4,6 +4,8 @@ import os
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
+import bounds
+import profiling
 import util
 from engines.heuristic_search import get_best_heuristic
 from util import *
@@ -19,22 +21,26 @@ def has_gap(var: gp.Var) -> bool:
 
 
 class MIP(AbpSolver):
+    threads = 8
+    time_limit = TIME_LIMIT
+
     @staticmethod
     def build_model(abp: AirplaneBoardingProblem) -> tuple[gp.Model, dict, dict]:
         m = gp.Model("Paper Airplane Boarding")
 
-        heuristic_two_opt_solution = get_best_heuristic(abp)
+        with profiling.phase("upper_bound"):
+            heuristic_two_opt_solution = get_best_heuristic(abp)
 
         # Variables --------------------------------------
         X = {
-            (p, i): m.addVar(vtype=gp.GRB.BINARY, name=f"X_{p},{i}")
+            (p.id, i): m.addVar(vtype=gp.GRB.BINARY, name=f"X_{p.id},{i}")
             for p in abp.passengers
             for i in abp.order
         }
 
         # Hot start solution with best heuristic
         for p, i in X:
-            X[p, i].Start = heuristic_two_opt_solution.ordering[i - 1] == p
+            X[p, i].Start = heuristic_two_opt_solution.ordering[i - 1].id == p
 
         TimeArrival = {
             (i, r): m.addVar(vtype=gp.GRB.CONTINUOUS)
@@ -58,7 +64,9 @@ class MIP(AbpSolver):
         }
 
         CompletionTime = m.addVar(
-            vtype=gp.GRB.CONTINUOUS, ub=discretise(heuristic_two_opt_solution.makespan)
+            vtype=gp.GRB.CONTINUOUS,
+            lb=bounds.lower_bound(abp),
+            ub=discretise(heuristic_two_opt_solution.makespan),
         )
 
         # Objective --------------------------------------
@@ -66,13 +74,13 @@ class MIP(AbpSolver):
 
         # Subject to --------------------------------------
         OrderMustBeFilled = {
-            i: m.addConstr(gp.quicksum(X[p, i] for p in abp.passengers) == 1)
+            i: m.addConstr(gp.quicksum(X[p.id, i] for p in abp.passengers) == 1)
             for i in abp.order
         }
 
         # Constraints
         OnePassengerOnePositionInOrder = {
-            p: m.addConstr(gp.quicksum(X[p, i] for i in abp.order) == 1)
+            p.id: m.addConstr(gp.quicksum(X[p.id, i] for i in abp.order) == 1)
             for p in abp.passengers
         }
 
@@ -87,13 +95,15 @@ class MIP(AbpSolver):
             for r in abp.rows[:-1]  # Not concerned with the last row
         }
 
+        # Ids of passengers seated by row r, only they can pass virtually
+        seated_by = {r: [p.id for p in abp.passengers if p.row <= r] for r in abp.rows}
+
         VirtualPassing = {
             (i, r): m.addConstr(
                 TimeArrival[i, r + 1] - TimeFinish[i, r]
                 <= gp.quicksum(
                     discretise(heuristic_two_opt_solution.makespan) * X[p, i]
-                    for p in abp.passengers
-                    if p.row <= r
+                    for p in seated_by[r]
                 )
             )
             for i in abp.order
@@ -107,13 +117,15 @@ class MIP(AbpSolver):
         }
 
         Tau = {
-            (p, r): time_taken_at_row(p, r) for p in abp.passengers for r in abp.rows
+            (p.id, r): time_taken_at_row(p, r) for p in abp.passengers for r in abp.rows
         }
+        # Passengers still in the aisle at row r, everyone else has Tau = 0
+        reaching = {r: [p.id for p in abp.passengers if p.row >= r] for r in abp.rows}
 
         MovementCost = {
             (i, r): m.addConstr(
                 TimeFinish[i, r] - TimeArrival[i, r]
-                >= gp.quicksum(Tau[p, r] * X[p, i] for p in abp.passengers)
+                >= gp.quicksum(Tau[p, r] * X[p, i] for p in reaching[r])
             )
             for i in abp.order
             for r in abp.rows
@@ -121,21 +133,49 @@ class MIP(AbpSolver):
 
         return m, X, TimeFinish
 
-    def solve_implementation(self, abp: AirplaneBoardingProblem) -> AbpSolution:
-        m, X, TimeFinish = self.build_model(abp)
+    @staticmethod
+    def fixed_order_finish_times(abp: AirplaneBoardingProblem, sol: AbpSolution):
+        """``TimeFinish`` of the paper model with the ordering of ``sol`` fixed.
 
-        m.params.TimeLimit = TIME_LIMIT
-        m.params.Threads = 8
+        Keyed by ``(p.id, r)`` like ``cp.get_wait_times``, to cross-check the
+        simulated CP hints against the MIP in ``benchmarks/cp_hints.py``.
+        """
+        m, X, TimeFinish = MIP.build_model(abp)
+        for i, p in enumerate(sol.ordering, start=1):
+            X[p.id, i].lb = 1
 
+        m.params.TimeLimit = TIME_LIMIT
         m.optimize()
 
+        return {
+            (p.id, r): TimeFinish[i, r].x
+            for i, p in enumerate(sol.ordering, start=1)
+            for r in abp.rows
+            if r <= p.row
+        }
+
+    def solve_implementation(self, abp: AirplaneBoardingProblem) -> AbpSolution:
+        with profiling.phase("build"):
+            m, X, TimeFinish = self.build_model(abp)
+            m.update()
+        profiling.record("variables", m.NumVars)
+        profiling.record("constraints", m.NumConstrs)
+        profiling.record("nonzeros", m.NumNZs)
+
+        m.params.TimeLimit = self.time_limit
+        m.params.Threads = self.threads
+
+        with profiling.phase("search"):
+            m.optimize(self._gurobi_stop_callback if self.stop_event else None)
+        profiling.record("nodes", m.NodeCount)
+
         result = [None for _ in range(len(set(p for p, i in X)))]
         if m.Status != gp.GRB.OPTIMAL or not has_gap(next(iter(X.values()))):
             return AbpSolution(abp, result, makespan=m.objVal)
 
         for p, i in X:
             if round(X[p, i].X) == 1:
-                result[i - 1] = p
+                result[i - 1] = abp.passengers[p]
 
         return AbpSolution(
             abp, result, makespan=m.ObjVal, range_=(m.ObjBound / 10, m.ObjVal / 10)
@@ -0,0 +1,272 @@
+# Hack import trick for relative imports
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from collections import namedtuple
+
+import numpy as np
+from scipy import sparse
+from scipy.optimize import Bounds, LinearConstraint, milp
+
+import bounds
+import profiling
+import util
+from engines.heuristic_search import get_best_heuristic, multi_start_heuristic
+from util import AbpSolver, AirplaneBoardingProblem, AbpSolution, discretise, TIME_LIMIT
+
+BACKENDS = ["highs", "gurobi"]
+
+# min c @ v subject to A @ v (sense) rhs and lb <= v <= ub, v[integrality] binary
+MipMatrices = namedtuple(
+    "MipMatrices", ["c", "A", "sense", "rhs", "lb", "ub", "integrality"]
+)
+
+
+def variable_indices(num_passengers: int, num_rows: int):
+    """Column of every variable of the paper model.
+
+    ``X[p, i]``, ``TimeArrival[i, r - 1]`` and ``TimeFinish[i, r - 1]`` for
+    0-indexed positions ``i``, followed by the ``CompletionTime`` column.
+    """
+    num_x = num_passengers * num_passengers
+    num_times = num_passengers * num_rows
+    X = np.arange(num_x).reshape(num_passengers, num_passengers)
+    TimeArrival = num_x + np.arange(num_times).reshape(num_passengers, num_rows)
+    TimeFinish = TimeArrival + num_times
+    return X, TimeArrival, TimeFinish, num_x + 2 * num_times
+
+
+def time_taken_at_rows(abp: AirplaneBoardingProblem) -> np.ndarray:
+    """``time_taken_at_row(p, r)`` as a (P x R) array, column ``r - 1``."""
+    evaluator = abp.evaluator
+    tau = np.zeros((abp.num_passengers, abp.num_rows), dtype=np.int64)
+    # Time at row r < row_p is the move to row r + 1
+    tau[:, :-1] = evaluator.move_into_row[:, 2:]
+    tau[np.arange(abp.num_passengers), evaluator.seat_rows - 1] = evaluator.settle_times
+    return tau
+
+
+def build_matrices(
+    abp: AirplaneBoardingProblem, upper_bound: int, lower_bound: int = 0
+) -> MipMatrices:
+    """The model of ``MIP.build_model`` as a sparse constraint matrix.
+
+    Each constraint family is a (K x T) array of variable columns with
+    matching coefficients, one row per constraint, so the matrix is built
+    from the evaluator arrays without a Python loop over passengers.
+    """
+    num_passengers, num_rows = abp.num_passengers, abp.num_rows
+    X, TimeArrival, TimeFinish, CompletionTime = variable_indices(
+        num_passengers, num_rows
+    )
+    num_vars = CompletionTime + 1
+
+    row_ids, columns, values, senses, rhs = [], [], [], [], []
+
+    def add(variables, coefficients, sense: str, b: float = 0):
+        coefficients = np.broadcast_to(coefficients, np.shape(variables))
+        variables = np.reshape(variables, (-1, np.shape(variables)[-1]))
+        num_constraints = len(variables)
+        offset = sum(map(len, senses))
+        row_ids.append(
+            np.broadcast_to(
+                offset + np.arange(num_constraints)[:, None], variables.shape
+            ).ravel()
+        )
+        columns.append(variables.ravel())
+        values.append(np.asarray(coefficients, dtype=float).ravel())
+        senses.append(np.full(num_constraints, sense))
+        rhs.append(np.full(num_constraints, b, dtype=float))
+
+    # X of the passengers at position i, repeated for each row
+    position_x = np.broadcast_to(
+        X.T[:, None, :], (num_passengers, num_rows, num_passengers)
+    )
+
+    # OrderMustBeFilled and OnePassengerOnePositionInOrder
+    add(X.T, 1, "=", 1)
+    add(X, 1, "=", 1)
+
+    # CompletionTimeSmallestFinish
+    add(
+        np.stack([np.full(num_passengers, CompletionTime), TimeFinish[:, -1]], axis=-1),
+        [1, -1],
+        ">",
+    )
+
+    # ArriveNextRowBeforeCurrent
+    add(np.stack([TimeArrival[:, 1:], TimeFinish[:, :-1]], axis=-1), [1, -1], ">")
+
+    # VirtualPassing, only passengers seated by row r can pass
+    seated_by = abp.evaluator.seat_rows[:, None] <= np.arange(1, num_rows)
+    add(
+        np.concatenate(
+            [
+                TimeArrival[:, 1:, None],
+                TimeFinish[:, :-1, None],
+                position_x[:, :-1],
+            ],
+            axis=-1,
+        ),
+        np.concatenate(
+            [
+                np.broadcast_to([1, -1], (num_rows - 1, 2)),
+                -upper_bound * seated_by.T,
+            ],
+            axis=-1,
+        ),
+        "<",
+    )
+
+    # NaturalAisleOrder
+    add(np.stack([TimeArrival[1:], TimeFinish[:-1]], axis=-1), [1, -1], ">")
+
+    # MovementCost, Tau is 0 for passengers seated before row r
+    add(
+        np.concatenate(
+            [TimeFinish[..., None], TimeArrival[..., None], position_x], axis=-1
+        ),
+        np.concatenate(
+            [np.broadcast_to([1, -1], (num_rows, 2)), -time_taken_at_rows(abp).T],
+            axis=-1,
+        ),
+        ">",
+    )
+
+    row_ids, columns, values = map(np.concatenate, (row_ids, columns, values))
+    nonzero = values != 0
+    sense = np.concatenate(senses)
+    A = sparse.csr_array(
+        (values[nonzero], (row_ids[nonzero], columns[nonzero])),
+        shape=(len(sense), num_vars),
+    )
+
+    c = np.zeros(num_vars)
+    c[CompletionTime] = 1
+    lb, ub = np.zeros(num_vars), np.full(num_vars, np.inf)
+    ub[X] = 1
+    lb[CompletionTime], ub[CompletionTime] = lower_bound, upper_bound
+    integrality = np.zeros(num_vars, dtype=np.uint8)
+    integrality[X] = 1
+
+    return MipMatrices(c, A, sense, np.concatenate(rhs), lb, ub, integrality)
+
+
+def warm_start(abp: AirplaneBoardingProblem, solution: AbpSolution) -> np.ndarray:
+    """Values of ``X`` and ``TimeArrival`` for ``solution``, NaN elsewhere."""
+    X, TimeArrival, _, CompletionTime = variable_indices(
+        abp.num_passengers, abp.num_rows
+    )
+    start = np.full(CompletionTime + 1, np.nan)
+    start[X] = 0
+    for i, (p, enter_row) in enumerate(
+        zip(solution.ordering, solution.passenger_enter_row)
+    ):
+        start[X[p.id, i]] = 1
+        # Rows after the seat are passed virtually at the last arrival
+        start[TimeArrival[i]] = max(enter_row)
+        start[TimeArrival[i, : p.row]] = enter_row[1 : p.row + 1]
+    return start
+
+
+def gurobi_model(matrices: MipMatrices, start: np.ndarray | None = None):
+    import gurobipy as gp  # Only the Gurobi backend needs a licence
+
+    m = gp.Model("Sparse Airplane Boarding")
+    v = m.addMVar(
+        len(matrices.c),
+        lb=matrices.lb,
+        ub=matrices.ub,
+        vtype=np.where(matrices.integrality, gp.GRB.BINARY, gp.GRB.CONTINUOUS),
+    )
+    m.setObjective(matrices.c @ v, gp.GRB.MINIMIZE)
+    m.addMConstr(matrices.A, v, matrices.sense, matrices.rhs)
+    if start is not None:
+        v.Start = np.where(np.isnan(start), gp.GRB.UNDEFINED, start)
+    return m, v
+
+
+def highs_constraint(matrices: MipMatrices) -> LinearConstraint:
+    lower = np.where(np.isin(matrices.sense, ["=", ">"]), matrices.rhs, -np.inf)
+    upper = np.where(np.isin(matrices.sense, ["=", "<"]), matrices.rhs, np.inf)
+    return LinearConstraint(matrices.A, lower, upper)
+
+
+class SparseMIP(AbpSolver):
+    """The paper MIP model built as sparse matrices.
+
+    Solved with HiGHS through ``scipy.optimize.milp`` by default, which needs
+    no licence but cannot be warm started or cancelled, or with Gurobi's
+    matrix API and the best heuristic as a start.
+    """
+
+    time_limit = TIME_LIMIT
+    # Upper bound and start from multi_start_heuristic on threads processes
+    multi_start = False
+
+    def __init__(self, backend: str = "highs"):
+        assert backend in BACKENDS, f"Unknown backend {backend}."
+        self.backend = backend
+        self.threads = 8 if backend == "gurobi" else 1
+
+    def solve_implementation(self, abp: AirplaneBoardingProblem) -> AbpSolution:
+        with profiling.phase("upper_bound"):
+            if self.multi_start:
+                heuristic_solution, _ = multi_start_heuristic(
+                    abp, workers=self.threads
+                )
+            else:
+                heuristic_solution = get_best_heuristic(abp)
+        upper_bound = discretise(heuristic_solution.makespan)
+        with profiling.phase("build"):
+            matrices = build_matrices(abp, upper_bound, bounds.lower_bound(abp))
+        profiling.record("constraints", matrices.A.shape[0])
+        profiling.record("variables", matrices.A.shape[1])
+        profiling.record("nonzeros", matrices.A.nnz)
+
+        if self.backend == "gurobi":
+            with profiling.phase("build"):
+                m, v = gurobi_model(matrices, warm_start(abp, heuristic_solution))
+            m.params.TimeLimit = self.time_limit
+            m.params.Threads = self.threads
+            with profiling.phase("search"):
+                m.optimize(self._gurobi_stop_callback if self.stop_event else None)
+            x = v.X if m.SolCount else None
+            objective, bound = (m.ObjVal if m.SolCount else None), m.ObjBound
+        else:
+            with profiling.phase("search"):
+                result = milp(
+                    matrices.c,
+                    integrality=matrices.integrality,
+                    bounds=Bounds(matrices.lb, matrices.ub),
+                    constraints=highs_constraint(matrices),
+                    options=dict(time_limit=self.time_limit),
+                )
+            x, objective = result.x, result.fun
+            bound = getattr(result, "mip_dual_bound", None) or objective
+
+        if x is None:
+            # No incumbent in time, the heuristic is feasible for the model
+            return AbpSolution(
+                abp,
+                heuristic_solution.ordering,
+                range_=(bound / 10 if bound else None, heuristic_solution.makespan),
+            )
+
+        X = x[: abp.num_passengers**2].reshape(abp.num_passengers, -1)
+        result = [abp.passengers[p] for p in X.argmax(axis=0)]
+        return AbpSolution(
+            abp, result, makespan=objective, range_=(bound / 10, objective / 10)
+        )
+
+
+if __name__ == "__main__":
+    abp = AirplaneBoardingProblem(util.CURRENT_ABP_PROBLEM)
+
+    mip_solver = SparseMIP()
+    mip_solution = mip_solver.solve(abp)
+    print(f"Solved in {mip_solution.computation_time:.2f}s")
+
+    mip_solution.make_solution_plot()
@@ -6,17 +6,39 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")
 
 import util
 from util import *
-import random
+import numpy as np
+from evaluator import BATCH_SIZE
 
 
 class Random(AbpSolver):
+    """Samples random orderings and keeps the best one."""
+
+    def __init__(self, num_samples: int = 1000, seed: int | None = None):
+        self.num_samples = num_samples
+        self.seed = seed
+
     def solve_implementation(self, abp: AirplaneBoardingProblem) -> AbpSolution:
-        result = random.sample(abp.passengers, len(abp.passengers))
-        return AbpSolution(problem=abp, ordering=result)
+        rng = np.random.default_rng(self.seed)
+        evaluator = abp.evaluator
+
+        best_makespan, best_ids = None, None
+        for start in range(0, self.num_samples, BATCH_SIZE):
+            num_orderings = min(BATCH_SIZE, self.num_samples - start)
+            orderings = rng.permuted(
+                np.tile(np.arange(abp.num_passengers), (num_orderings, 1)), axis=1
+            )
+            makespans = evaluator.batch_makespans(orderings)
+
+            best = makespans.argmin()
+            if best_makespan is None or makespans[best] < best_makespan:
+                best_makespan, best_ids = makespans[best], orderings[best]
+
+        result = [abp.passengers[i] for i in best_ids]
+        return AbpSolution(problem=abp, ordering=result, makespan=int(best_makespan))
 
 
 if __name__ == "__main__":
     abp = AirplaneBoardingProblem(util.CURRENT_ABP_PROBLEM)
-    rand_solver = Random()
+    rand_solver = Random(num_samples=1_000_000)
     solution = rand_solver.solve(abp)
     solution.visualise_solution()
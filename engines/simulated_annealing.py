@@ -0,0 +1,185 @@
+# Hack import trick for relative imports
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import math
+import time
+
+import numpy as np
+
+import best_known
+import profiling
+import util
+from engines.max_settle_row import MaxSettleRow
+from util import AbpSolver, AirplaneBoardingProblem, AbpSolution
+
+
+class SimulatedAnnealing(AbpSolver):
+    """Simulated annealing over insertion and swap moves.
+
+    Starts from the better of ``MaxSettleRow`` and the best known ordering.
+    Every iteration scores a whole neighbourhood at once and applies the
+    Metropolis criterion to its best move, with a temperature cooling
+    geometrically over the budget (whichever of ``time_limit`` and
+    ``max_iterations`` runs out first, only an iteration budget is
+    reproducible for a given ``seed``):
+
+    - insertion: a random passenger is taken out and put back at every other
+      position. One pass over the ordering without them gives the states
+      before each position and ``BoardingEvaluator.tail_weights`` the effect
+      of what follows, so each position only costs boarding one passenger.
+    - swap: ``num_swaps`` random swaps inside a window of ``swap_window``
+      positions, simulated from the state before the window with the tail
+      weights after it.
+    """
+
+    def __init__(
+        self,
+        time_limit: float | None = 60,
+        max_iterations: int | None = None,
+        seed: int | None = None,
+        swap_probability: float = 0.3,
+        num_swaps: int = 256,
+        swap_window: int = 24,
+        initial_temperature: float = 0.01,  # Fraction of the start makespan
+        final_temperature: float = 1.0,  # Discretised time units
+    ):
+        assert time_limit or max_iterations, "SimulatedAnnealing needs a budget."
+        self.time_limit = time_limit
+        self.max_iterations = max_iterations
+        self.seed = seed
+        self.swap_probability = swap_probability
+        self.num_swaps = num_swaps
+        self.swap_window = swap_window
+        self.initial_temperature = initial_temperature
+        self.final_temperature = final_temperature
+
+        self.iterations = 0
+        self.moves_evaluated = 0
+        self.moves_per_second = 0.0
+
+    def _progress(self, start: float) -> float:
+        progress = 0.0
+        if self.time_limit:
+            progress = (time.time() - start) / self.time_limit
+        if self.max_iterations:
+            progress = max(progress, self.iterations / self.max_iterations)
+        return progress
+
+    def solve_implementation(self, abp: AirplaneBoardingProblem) -> AbpSolution:
+        rng = np.random.default_rng(self.seed)
+        evaluator = abp.evaluator
+
+        ids = [p.id for p in MaxSettleRow().solve(abp).ordering]
+        stored = best_known.lookup(abp)
+        if stored is not None and evaluator.makespan(stored) < evaluator.makespan(ids):
+            ids = stored
+        ids = np.array(ids)
+        num_passengers = len(ids)
+        window = min(self.swap_window, num_passengers)
+        makespan = evaluator.makespan(ids.tolist())
+        best_makespan, best_ids = makespan, ids.copy()
+
+        # Prefix states are current up to states_valid and tail weights from
+        # weights_valid, accepting a move only makes the span it changed stale.
+        states = evaluator.prefix_states(ids.tolist())
+        weights = evaluator.tail_weights(ids)
+        states_valid, weights_valid = num_passengers, 0
+
+        def refresh(last_state: int, first_weight: int):
+            nonlocal states_valid, weights_valid
+            if last_state > states_valid:
+                states[states_valid : last_state + 1] = evaluator.prefix_states(
+                    ids[:last_state].tolist(), states_valid, states[states_valid]
+                )
+                states_valid = last_state
+            if first_weight < weights_valid:
+                weights[first_weight : weights_valid + 1] = evaluator.tail_weights(
+                    ids, first_weight, weights_valid, weights[weights_valid]
+                )
+                weights_valid = first_weight
+
+        t0 = max(self.initial_temperature * makespan, self.final_temperature)
+        cooling = self.final_temperature / t0
+
+        self.iterations = self.moves_evaluated = 0
+        start = time.time()
+        while (progress := self._progress(start)) < 1 and not self.stopped():
+            temperature = t0 * cooling**progress
+
+            if rng.random() < self.swap_probability:
+                anchor = int(rng.integers(num_passengers - window + 1))
+                end = anchor + window
+                refresh(anchor, end)
+
+                i = rng.integers(window - 1, size=self.num_swaps)
+                j = i + 1 + (rng.random(self.num_swaps) * (window - 1 - i)).astype(int)
+                batch = np.arange(self.num_swaps)
+                moved = np.tile(ids[anchor:end], (self.num_swaps, 1))
+                moved[batch, i], moved[batch, j] = moved[batch, j], moved[batch, i]
+
+                row_blockage, makespans = evaluator.batch_states(moved, states[anchor])
+                makespans = np.maximum(
+                    makespans, (row_blockage + weights[end]).max(axis=1)
+                )
+                k, num_moves = makespans.argmin(), self.num_swaps
+                candidate = lambda: moved[k]
+            else:
+                i = int(rng.integers(num_passengers))
+                refresh(i, i + 1)
+
+                # Position k of the ordering without passenger i
+                passenger, without = ids[i], np.delete(ids, i)
+                after = states[:i] + evaluator.prefix_states(
+                    without.tolist(), i, states[i]
+                )
+                row_blockage = np.array([state[0] for state in after])
+                makespans = np.array([state[1] for state in after])
+                tails = np.concatenate(
+                    [
+                        evaluator.tail_weights(without, 0, i, weights[i + 1])[:i],
+                        weights[i + 1 :],
+                    ]
+                )
+
+                evaluator.board(
+                    np.full(num_passengers, passenger), row_blockage, makespans
+                )
+                makespans = np.maximum(makespans, (row_blockage + tails).max(axis=1))
+                makespans[i] = np.iinfo(np.int64).max  # Not moving
+                k, num_moves = makespans.argmin(), num_passengers - 1
+                anchor, end = min(i, k), max(i, k) + 1
+                candidate = lambda: np.insert(without, k, passenger)[anchor:end]
+
+            self.iterations += 1
+            self.moves_evaluated += num_moves
+
+            delta = makespans[k] - makespan
+            if delta <= 0 or rng.random() < math.exp(-delta / temperature):
+                ids[anchor:end] = candidate()
+                makespan = int(makespans[k])
+                states_valid = min(states_valid, anchor)
+                weights_valid = max(weights_valid, end)
+                if makespan < best_makespan:
+                    best_makespan, best_ids = makespan, ids.copy()
+
+        elapsed = time.time() - start
+        profiling.count("iterations", self.iterations)
+        profiling.count("moves_evaluated", self.moves_evaluated)
+        self.moves_per_second = self.moves_evaluated / elapsed if elapsed else 0.0
+        print(
+            f"SimulatedAnnealing: {self.iterations} iterations, "
+            f"{self.moves_per_second:,.0f} moves/s"
+        )
+
+        result = [abp.passengers[i] for i in best_ids]
+        return AbpSolution(abp, result, makespan=best_makespan)
+
+
+if __name__ == "__main__":
+    abp = AirplaneBoardingProblem(util.CURRENT_ABP_PROBLEM)
+    sa_solver = SimulatedAnnealing()
+    solution = sa_solver.solve(abp)
+    solution.visualise_solution()
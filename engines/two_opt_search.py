@@ -1,20 +1,58 @@
-from util import Passenger, AbpSolution, AirplaneBoardingProblem
+import time
 
+import profiling
+from util import AbpSolution, AirplaneBoardingProblem
 
-def two_opt_search(abp: AirplaneBoardingProblem, solution: AbpSolution):
-    found_improvement = True
-    curr_solution = solution
-    while found_improvement:
-        found_improvement = False
-        for i in range(len(curr_solution.ordering)):
-            for j in range(i + 1, len(curr_solution.ordering)):
+
+def two_opt_search(
+    abp: AirplaneBoardingProblem,
+    solution: AbpSolution,
+    stats: dict | None = None,
+    deadline: float | None = None,
+):
+    evaluator = abp.evaluator
+    ids = [p.id for p in solution.ordering]
+    makespan = evaluator.makespan(ids)
+    # Blockage state after each prefix, swaps at (i, j) only re-simulate ids[i:]
+    states = evaluator.prefix_states(ids)
+
+    stats = {} if stats is None else stats
+    stats.setdefault("moves_evaluated", 0)
+    stats.setdefault("passes", 0)
+    moves_before = stats["moves_evaluated"]
+
+    found_improvement = False
+    improved = True
+    while improved:
+        improved = False
+        stats["passes"] += 1
+        for i in range(len(ids)):
+            # Out of time, keep the best ordering found so far
+            if deadline is not None and time.time() > deadline:
+                improved = False
+                break
+
+            # Prefix alone already reaches the incumbent, no swap here can help
+            if states[i][1] >= makespan:
+                continue
+
+            for j in range(i + 1, len(ids)):
                 # Swap positions
-                new_ordering = curr_solution.ordering.copy()
-                new_ordering[i], new_ordering[j] = new_ordering[j], new_ordering[i]
+                stats["moves_evaluated"] += 1
+                ids[i], ids[j] = ids[j], ids[i]
+
+                new_makespan = evaluator.makespan_from(
+                    ids, i, states[i], cutoff=makespan
+                )
+                if new_makespan is not None:
+                    makespan = new_makespan
+                    states[i:] = evaluator.prefix_states(ids, i, states[i])
+                    found_improvement = improved = True
+                else:
+                    ids[i], ids[j] = ids[j], ids[i]
 
-                new_solution = AbpSolution(abp, new_ordering)
-                if new_solution.makespan < curr_solution.makespan:
-                    curr_solution = new_solution
-                    found_improvement = True
+    profiling.count("two_opt_moves", stats["moves_evaluated"] - moves_before)
+    if not found_improvement:
+        return solution
 
-    return curr_solution
+    return AbpSolution(abp, [abp.passengers[i] for i in ids], makespan=makespan)
@@ -0,0 +1,278 @@
+"""Array-backed boarding simulation shared by every engine."""
+
+import hashlib
+import itertools
+import threading
+
+import numpy as np
+
+import profiling
+
+BATCH_SIZE = 1024  # Orderings simulated together, keeps the working set in cache
+NO_PATH = -(1 << 40)  # Tail weight of rows that cannot delay the makespan
+# Row blockage buffer of the scalar kernel, one per thread
+_scratch = threading.local()
+
+
+class BoardingEvaluator:
+    """Precomputed move and settle times for one set of passengers.
+
+    Built once per ``AirplaneBoardingProblem`` (see ``abp.evaluator``). Orderings
+    are given as sequences of passenger ids. ``makespan`` is the hot path and
+    only tracks the row blockages; ``enter_times`` rebuilds the full entry-time
+    matrix and is only needed for plotting, Gantt charts and MIP warm starts.
+    ``batch_makespans`` scores many orderings at once with numpy.
+    """
+
+    def __init__(self, passengers, num_rows: int):
+        self.passengers = passengers
+        self.num_rows = num_rows
+        self.num_passengers = len(passengers)
+
+        # seat_rows[p] is the 1-indexed row of passenger p, move_into_row[p, r]
+        # is the time it takes p to reach row r from row r - 1 (r <= seat row).
+        self.seat_rows = np.array([p.row for p in passengers], dtype=np.int64)
+        self.settle_times = np.array(
+            [p.settle_time for p in passengers], dtype=np.int64
+        )
+        self.move_into_row = np.zeros(
+            (self.num_passengers, num_rows + 1), dtype=np.int64
+        )
+        for p in passengers:
+            for r in range(1, p.row + 1):
+                self.move_into_row[p.id, r] = p.move_times[r - 2]
+
+        # Indexing numpy arrays element-wise is slower than indexing tuples, so
+        # the scalar kernel reads the same data through plain Python objects.
+        row_ranges = [range(1, r + 1) for r in range(num_rows + 1)]
+        self._kernel_table = [
+            (
+                row_ranges[p.row],
+                p.row,
+                tuple(self.move_into_row[p.id].tolist()),
+                p.settle_time,
+            )
+            for p in passengers
+        ]
+        self.initial_state = ((0,) * (num_rows + 1), 0)
+
+        # Entering row r at time t costs cum_move_times[p, r] from row 0, so the
+        # entry times are a running maximum of (row_blockage - cum_move_times).
+        self.cum_move_times = np.cumsum(self.move_into_row, axis=1)
+        self._tail_table = [
+            (
+                row_ranges[p.row - 1][::-1],
+                p.row,
+                tuple(self.cum_move_times[p.id].tolist()),
+                p.settle_time,
+            )
+            for p in passengers
+        ]
+
+        # Passengers with the same profile id are interchangeable in an ordering
+        profiles = {}
+        self.profile_ids = np.array(
+            [
+                profiles.setdefault(entry[1:], len(profiles))
+                for entry in self._kernel_table
+            ],
+            dtype=np.int64,
+        )
+
+        # Identifies the passengers' data, equal instances share cached results
+        content = hashlib.sha1(str(num_rows).encode())
+        for array in (
+            np.array([p.column for p in passengers], dtype=np.int64),
+            self.seat_rows,
+            self.settle_times,
+            self.move_into_row,
+        ):
+            content.update(array.tobytes())
+        self.content_hash = content.hexdigest()
+
+    def makespan(self, ids) -> int:
+        """Makespan of boarding the passengers ``ids`` in order."""
+        return self.makespan_from(ids, 0, self.initial_state)
+
+    def makespan_from(self, ids, start: int, state, cutoff=None) -> int | None:
+        """Makespan of ``ids`` given the ``state`` reached after ``ids[:start]``.
+
+        Returns ``None`` as soon as the makespan reaches ``cutoff``, the partial
+        makespan never decreases so the ordering can no longer beat it.
+        """
+        profiling.count("simulations")
+        # Each thread reuses its own buffer, threads may share an evaluator
+        row_blockage = getattr(_scratch, "row_blockage", None)
+        if row_blockage is None or len(row_blockage) != len(state[0]):
+            row_blockage = _scratch.row_blockage = list(state[0])
+        else:
+            row_blockage[:] = state[0]
+        makespan = state[1]
+        if cutoff is None:
+            cutoff = float("inf")
+
+        for rows, seat_row, move_into_row, settle_time in map(
+            self._kernel_table.__getitem__, itertools.islice(ids, start, None)
+        ):
+            # Maximum of either passenger moving or when the row becomes free
+            t = row_blockage[0]
+            for r in rows:
+                t += move_into_row[r]
+                blocked_until = row_blockage[r]
+                if blocked_until > t:
+                    t = blocked_until
+                row_blockage[r - 1] = t
+
+            t += settle_time
+            row_blockage[seat_row] = t
+            if t > makespan:
+                makespan = t
+                if makespan >= cutoff:
+                    return None
+
+        return makespan
+
+    def prefix_states(self, ids, start: int = 0, state=None) -> list[tuple]:
+        """States (row blockages, makespan) after ``ids[:k]`` for ``k >= start``.
+
+        ``state`` is the state after ``ids[:start]``, so stale checkpoints can
+        be refreshed from the first changed position onwards.
+        """
+        profiling.count("simulations")
+        row_blockage, makespan = state or self.initial_state
+        row_blockage = list(row_blockage)
+        states = [(tuple(row_blockage), makespan)]
+        for rows, seat_row, move_into_row, settle_time in map(
+            self._kernel_table.__getitem__, itertools.islice(ids, start, None)
+        ):
+            t = row_blockage[0]
+            for r in rows:
+                t += move_into_row[r]
+                if row_blockage[r] > t:
+                    t = row_blockage[r]
+                row_blockage[r - 1] = t
+
+            t += settle_time
+            row_blockage[seat_row] = t
+            makespan = max(makespan, t)
+            states.append((tuple(row_blockage), makespan))
+
+        return states
+
+    def tail_weights(
+        self, ids, start: int = 0, end: int | None = None, tail=None
+    ) -> np.ndarray:
+        """Weights ``w[k]`` giving the makespan of ``ids[k:]`` from any state.
+
+        Boarding is max-plus linear in the row blockages, so once the state
+        ``(row_blockage, makespan)`` after ``ids[:k]`` is known the final
+        makespan is ``max(makespan, max(w[k] + row_blockage))``. ``w[k, r]`` is
+        the longest chain of moves and settles from row ``r`` being freed to
+        someone sitting down, ``NO_PATH`` when there is none.
+
+        Returns ``w[start..end]``; ``tail`` is ``w[end]`` when only the
+        weights before ``end`` are stale.
+        """
+        end = len(ids) if end is None else end
+        after = [NO_PATH] * (self.num_rows + 1) if tail is None else tail.tolist()
+        weights = [after]
+        for rows, seat_row, cum_move_times, settle_time in map(
+            self._tail_table.__getitem__,
+            itertools.islice(reversed(ids), len(ids) - end, len(ids) - start),
+        ):
+            before = after[:]
+            # Entering row r frees row r - 1, entering the seat row also leads
+            # to sitting down there. Row a only delays entering rows r >= a.
+            longest = (
+                max(after[seat_row - 1], max(after[seat_row], 0) + settle_time)
+                + cum_move_times[seat_row]
+            )
+            before[seat_row] = longest - cum_move_times[seat_row]
+            for r in rows:
+                chain = after[r - 1] + cum_move_times[r]
+                if chain > longest:
+                    longest = chain
+                before[r] = longest - cum_move_times[r]
+            before[0] = longest
+
+            weights.append(before)
+            after = before
+
+        return np.array(weights[::-1], dtype=np.int64)
+
+    def enter_times(self, ids) -> list[list[int]]:
+        """Time each passenger enters rows ``0..row_p``, indexed by position."""
+        row_blockage = [0] * (self.num_rows + 1)
+        enter_row = []
+        for rows, seat_row, move_into_row, settle_time in map(
+            self._kernel_table.__getitem__, ids
+        ):
+            t = row_blockage[0]
+            entered = [t]
+            for r in rows:
+                t += move_into_row[r]
+                if row_blockage[r] > t:
+                    t = row_blockage[r]
+                row_blockage[r - 1] = t
+                entered.append(t)
+
+            row_blockage[seat_row] = t + settle_time
+            enter_row.append(entered)
+
+        return enter_row
+
+    def batch_makespans(
+        self, orderings, batch_size: int = BATCH_SIZE, state=None
+    ) -> np.ndarray:
+        """Makespans of a (K x P) array of orderings, vectorised over K.
+
+        With a ``state`` the orderings are suffixes boarding after the prefix
+        that reached it, as in ``makespan_from``.
+        """
+        orderings = np.asarray(orderings, dtype=np.int64)
+        makespans = np.empty(len(orderings), dtype=np.int64)
+        for start in range(0, len(orderings), batch_size):
+            batch = orderings[start : start + batch_size]
+            makespans[start : start + len(batch)] = self.batch_states(batch, state)[1]
+        return makespans
+
+    def batch_states(
+        self, orderings: np.ndarray, state=None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Row blockages (K x R+1) and makespans after each of the orderings."""
+        row_blockage, makespan = state or self.initial_state
+        num_orderings = len(orderings)
+        profiling.count("simulations", num_orderings)
+        row_blockage = np.tile(
+            np.array(row_blockage, dtype=np.int64), (num_orderings, 1)
+        )
+        makespans = np.full(num_orderings, makespan, dtype=np.int64)
+
+        for ids in orderings.T:
+            self.board(ids, row_blockage, makespans)
+
+        return row_blockage, makespans
+
+    def board(self, ids: np.ndarray, row_blockage: np.ndarray, makespans: np.ndarray):
+        """Board passenger ``ids[k]`` after state ``k``, updating states in place.
+
+        ``row_blockage`` is (K x R+1) and ``makespans`` has length K.
+        """
+        seat_rows = self.seat_rows[ids]
+        cum_move_times = self.cum_move_times[ids]
+
+        # enter[r] = max(enter[r - 1] + move, row_blockage[r]) for every row
+        enter = np.subtract(row_blockage, cum_move_times)
+        np.maximum.accumulate(enter, axis=1, out=enter)
+        enter += cum_move_times
+
+        # Rows before the seat are blocked until the passenger moves on
+        np.copyto(
+            row_blockage[:, :-1],
+            enter[:, 1:],
+            where=np.arange(self.num_rows) < seat_rows[:, None],
+        )
+        batch = np.arange(len(ids))
+        seated = enter[batch, seat_rows] + self.settle_times[ids]
+        row_blockage[batch, seat_rows] = seated
+        np.maximum(makespans, seated, out=makespans)
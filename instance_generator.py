@@ -0,0 +1,105 @@
+"""Seeded synthetic instances in the JSON schema of ``data/mp_sp``.
+
+Distributions follow the ``mp_sp`` instances: every passenger has one move
+time per row around 2.4s, 60/30/10% of passengers carry 1/2/3 bags, settle
+times grow with luggage, and about 44% of passengers travel in groups of 2
+or 3 sitting next to each other. ``python3 instance_generator.py 60 10``
+writes instances to ``data/synthetic``.
+"""
+
+import argparse
+import json
+import os
+
+import numpy as np
+
+from instance_store import arrays_from_json
+from util import AirplaneBoardingProblem, AbpFilepath
+
+SYNTHETIC_DIR = os.path.join(os.path.dirname(__file__), "data/synthetic")
+
+LUGGAGE_PROBABILITIES = [0.6, 0.3, 0.1]  # 1, 2 and 3 bags
+MEAN_SETTLE_TIMES = [16.6, 30.6, 43.4]  # By number of bags
+SETTLE_TIME_SHAPE = 3.0  # Gamma shape, gives the right skew of mp_sp
+GROUPED_FRACTION = 0.44
+TRIPLE_FRACTION = 0.1  # Of the groups
+
+
+def instance_name(num_rows: int, num_cols: int, seed: int) -> str:
+    return f"synthetic__{num_rows}_{num_cols}__{seed}"
+
+
+def generate_instance(num_rows: int, num_cols: int, seed: int) -> dict:
+    """JSON data of a random instance, the same for the same arguments."""
+    assert num_cols % 2 == 0, "Seats are split evenly on both sides of the aisle."
+    rng = np.random.default_rng([num_rows, num_cols, seed])
+    num_passengers = num_rows * num_cols
+
+    # Passenger i sits in seats[i], in a random order like mp_sp
+    seats = np.array([(r, c) for r in range(num_rows) for c in range(num_cols)])
+    order = rng.permutation(num_passengers)
+    pax_seats = seats[order]
+
+    luggage = rng.choice([1, 2, 3], size=num_passengers, p=LUGGAGE_PROBABILITIES)
+    mean_settle = np.array(MEAN_SETTLE_TIMES)[luggage - 1]
+    settle_times = np.maximum(
+        rng.gamma(SETTLE_TIME_SHAPE, mean_settle / SETTLE_TIME_SHAPE), 2.5
+    ).round(1)
+    move_times = np.clip(rng.normal(2.4, 0.25, num_passengers), 1.8, 3.0).round(1)
+
+    # Groups take neighbouring seats of a row, rows visited in a random order
+    passenger_at = np.empty((num_rows, num_cols), dtype=int)
+    passenger_at[pax_seats[:, 0], pax_seats[:, 1]] = np.arange(num_passengers)
+    groups, grouped = [], 0
+    for r in rng.permutation(num_rows):
+        c = 0
+        while grouped < GROUPED_FRACTION * num_passengers:
+            size = 3 if rng.random() < TRIPLE_FRACTION else 2
+            if c + size > num_cols:
+                break
+            groups.append(passenger_at[r, c : c + size].tolist())
+            grouped += size
+            c += size + int(rng.integers(2))
+
+    return {
+        "instance_name": instance_name(num_rows, num_cols, seed),
+        "n_seats_row": [[num_cols // 2, num_cols // 2]] * num_rows,
+        "pax_groups": groups,
+        "pax_luggage": luggage.tolist(),
+        "pax_seats": pax_seats.tolist(),
+        "times_clear": settle_times.tolist(),
+        "times_move": [[m] * int(r) for m, r in zip(move_times, pax_seats[:, 0])],
+        "times_seat_interference": [10.0] * num_passengers,
+    }
+
+
+def synthetic_problem(
+    num_rows: int, num_cols: int, seed: int
+) -> AirplaneBoardingProblem:
+    return AirplaneBoardingProblem(
+        AbpFilepath(num_rows, num_cols, seed),
+        instance=arrays_from_json(generate_instance(num_rows, num_cols, seed)),
+    )
+
+
+def write_instances(
+    num_rows: int, num_cols: int, seeds: range, data_dir: str = SYNTHETIC_DIR
+):
+    directory = os.path.join(data_dir, f"{num_rows}_{num_cols}")
+    os.makedirs(directory, exist_ok=True)
+    for seed in seeds:
+        json_data = generate_instance(num_rows, num_cols, seed)
+        filename = f"{json_data['instance_name']}.json"
+        with open(os.path.join(directory, filename), "w") as f:
+            json.dump(dict(filename=filename, **json_data), f, indent=4)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("num_rows", type=int)
+    parser.add_argument("num_cols", type=int)
+    parser.add_argument("--seeds", type=int, default=10)
+    parser.add_argument("--data-dir", default=SYNTHETIC_DIR)
+    args = parser.parse_args()
+
+    write_instances(args.num_rows, args.num_cols, range(args.seeds), args.data_dir)
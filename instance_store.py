@@ -0,0 +1,162 @@
+"""Binary, memory-mapped copy of the ``data/mp_sp`` instances.
+
+``python3 instance_store.py`` compiles every JSON instance once into a few
+``.npy`` arrays (all instances concatenated) plus a manifest of offsets. The
+arrays are opened with ``mmap_mode="r"`` on first use, so processes of a sweep
+share the same pages instead of each parsing JSON. Without a compiled store
+``load_instance`` falls back to the JSON files.
+"""
+
+import glob
+import json
+import os
+from collections import namedtuple
+
+import numpy as np
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data/mp_sp")
+STORE_DIR = os.path.join(os.path.dirname(__file__), "data/mp_sp_store")
+MANIFEST = "manifest.json"
+
+# Per-passenger arrays, times are discretised to tenths like the solvers use.
+# pax_group is the index of the passenger's travel group in pax_groups, or -1.
+InstanceArrays = namedtuple(
+    "InstanceArrays",
+    [
+        "num_rows",
+        "num_cols",
+        "pax_seats",
+        "times_clear",
+        "times_move",
+        "pax_luggage",
+        "pax_group",
+        "times_seat_interference",
+    ],
+)
+ARRAY_FIELDS = InstanceArrays._fields[2:]
+
+
+def instance_name(filepath) -> str:
+    num_rows, num_columns, test_num = filepath
+    return f"mp_sp__{num_rows}_{num_columns}__{test_num}"
+
+
+def json_path(filepath) -> str:
+    num_rows, num_columns, _ = filepath
+    return os.path.join(
+        DATA_DIR, f"{num_rows}_{num_columns}", f"{instance_name(filepath)}.json"
+    )
+
+
+def arrays_from_json(json_data: dict) -> InstanceArrays:
+    num_rows = len(json_data["n_seats_row"])
+    num_passengers = len(json_data["times_move"])
+
+    times_move = np.zeros((num_passengers, num_rows), dtype=np.int32)
+    for i, move_times in enumerate(json_data["times_move"]):
+        times_move[i, : len(move_times)] = [int(10 * m_time) for m_time in move_times]
+
+    pax_group = np.full(num_passengers, -1, dtype=np.int32)
+    for g, group in enumerate(json_data["pax_groups"]):
+        pax_group[group] = g
+
+    return InstanceArrays(
+        num_rows=num_rows,
+        num_cols=sum(json_data["n_seats_row"][0]),
+        pax_seats=np.array(json_data["pax_seats"], dtype=np.int32),
+        times_clear=np.array(
+            [int(10 * c_time) for c_time in json_data["times_clear"]], dtype=np.int32
+        ),
+        times_move=times_move,
+        pax_luggage=np.array(json_data["pax_luggage"], dtype=np.int32),
+        pax_group=pax_group,
+        times_seat_interference=np.array(
+            [int(10 * i_time) for i_time in json_data["times_seat_interference"]],
+            dtype=np.int32,
+        ),
+    )
+
+
+def compile_store(data_dir: str = DATA_DIR, store_dir: str = STORE_DIR):
+    """Concatenate every instance in ``data_dir`` into arrays in ``store_dir``."""
+    filenames = sorted(glob.glob(os.path.join(data_dir, "*", "*.json")))
+    instances = {}
+    for filename in filenames:
+        with open(filename, "r") as f:
+            json_data = json.load(f)
+        instances[json_data["instance_name"]] = arrays_from_json(json_data)
+
+    max_rows = max(instance.num_rows for instance in instances.values())
+    manifest, offset = {}, 0
+    for name, instance in instances.items():
+        num_passengers = len(instance.times_clear)
+        manifest[name] = dict(
+            offset=offset,
+            num_passengers=num_passengers,
+            num_rows=instance.num_rows,
+            num_cols=instance.num_cols,
+        )
+        offset += num_passengers
+
+    os.makedirs(store_dir, exist_ok=True)
+    for field in ARRAY_FIELDS:
+        arrays = [getattr(instance, field) for instance in instances.values()]
+        if field == "times_move":
+            arrays = [np.pad(a, ((0, 0), (0, max_rows - a.shape[1]))) for a in arrays]
+        np.save(os.path.join(store_dir, f"{field}.npy"), np.concatenate(arrays))
+
+    # Manifest last, a half-written store is never picked up
+    with open(os.path.join(store_dir, MANIFEST), "w") as f:
+        json.dump(manifest, f)
+
+
+class InstanceStore:
+    def __init__(self, store_dir: str = STORE_DIR):
+        with open(os.path.join(store_dir, MANIFEST), "r") as f:
+            self.manifest = json.load(f)
+        self.store_dir = store_dir
+        self._arrays = {}
+        # Stores compiled before a field was added are ignored until recompiled
+        self.complete = all(
+            os.path.exists(os.path.join(store_dir, f"{field}.npy"))
+            for field in ARRAY_FIELDS
+        )
+
+    def _array(self, field: str) -> np.ndarray:
+        if field not in self._arrays:
+            self._arrays[field] = np.load(
+                os.path.join(self.store_dir, f"{field}.npy"), mmap_mode="r"
+            )
+        return self._arrays[field]
+
+    def __contains__(self, filepath) -> bool:
+        return instance_name(filepath) in self.manifest
+
+    def __getitem__(self, filepath) -> InstanceArrays:
+        entry = self.manifest[instance_name(filepath)]
+        passengers = slice(entry["offset"], entry["offset"] + entry["num_passengers"])
+        arrays = {field: self._array(field)[passengers] for field in ARRAY_FIELDS}
+        arrays["times_move"] = arrays["times_move"][:, : entry["num_rows"]]
+        return InstanceArrays(
+            num_rows=entry["num_rows"], num_cols=entry["num_cols"], **arrays
+        )
+
+
+_store: InstanceStore | None = None
+
+
+def load_instance(filepath) -> InstanceArrays:
+    """Arrays of one instance, from the compiled store when there is one."""
+    global _store
+    if _store is None and os.path.exists(os.path.join(STORE_DIR, MANIFEST)):
+        _store = InstanceStore()
+    if _store is not None and _store.complete and filepath in _store:
+        return _store[filepath]
+
+    with open(json_path(filepath), "r") as f:
+        return arrays_from_json(json.load(f))
+
+
+if __name__ == "__main__":
+    compile_store()
+    print(f"Compiled {DATA_DIR} into {STORE_DIR}")
@@ -0,0 +1,83 @@
+"""Phase timers and counters of a solve, collected by ``AbpSolver.solve``.
+
+Engines call ``phase``, ``count`` and ``record`` wherever the work happens,
+all three do nothing outside a solve. Solves started inside another solve,
+such as the heuristics run by ``get_best_heuristic``, add to the outer
+profile instead of starting their own. Each thread has its own active
+profile, so concurrent solves in the solve service do not mix, even on a
+shared evaluator: it counts its simulations into the active profile.
+"""
+
+import contextlib
+import cProfile
+import threading
+import time
+
+_local = threading.local()
+
+
+def _active() -> "SolveProfile | None":
+    return getattr(_local, "profile", None)
+
+
+class SolveProfile:
+    def __init__(self):
+        # Seconds, phases may nest (CP's build includes its upper_bound)
+        self.phases: dict[str, float] = {}
+        self.counters: dict[str, int | float] = {"simulations": 0}
+
+    def as_dict(self) -> dict:
+        return dict(phases=self.phases, counters=self.counters)
+
+
+@contextlib.contextmanager
+def phase(name: str):
+    profile = _active()
+    if profile is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.phases[name] = (
+            profile.phases.get(name, 0.0) + time.perf_counter() - start
+        )
+
+
+def count(name: str, n: int = 1):
+    profile = _active()
+    if profile is not None:
+        profile.counters[name] = profile.counters.get(name, 0) + n
+
+
+def record(name: str, value: int | float):
+    # Sizes rather than totals, e.g. the number of model variables
+    profile = _active()
+    if profile is not None:
+        profile.counters[name] = value
+
+
+@contextlib.contextmanager
+def profiled(profile_path: str | None = None):
+    """Profile of the solve run inside, ``None`` when nested in another solve.
+
+    With ``profile_path`` the solve is also run under cProfile and its stats
+    dumped there.
+    """
+    if _active() is not None:
+        yield None
+        return
+
+    profile = _local.profile = SolveProfile()
+    profiler = cProfile.Profile() if profile_path else None
+    try:
+        if profiler:
+            profiler.enable()
+        yield profile
+    finally:
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(profile_path)
+        _local.profile = None
@@ -0,0 +1,270 @@
+"""SQLite store of solver runs, replacing the per-run JSON files in results/.
+
+Every run is a row of ``runs``, indexed by instance, solver and size class.
+The database uses WAL journaling, so sweep workers can write concurrently
+while others read. On first use the existing ``results/<rows>_<cols>/*.json``
+tree is imported in a single transaction.
+
+``objective_value`` is what the solver reported, for CP runs the objective
+of the model, which some stored runs have broken (e.g. -8.36e17). Runs are
+ranked on ``makespan`` instead, their ordering simulated again on insert.
+"""
+
+import glob
+import json
+import os
+import sqlite3
+import sys
+import time
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+DB_PATH = os.path.join(RESULTS_DIR, "results.db")
+
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS runs (
+        id INTEGER PRIMARY KEY,
+        algorithm TEXT NOT NULL,
+        instance_name TEXT NOT NULL,
+        num_rows INTEGER NOT NULL,
+        num_cols INTEGER NOT NULL,
+        test_number INTEGER NOT NULL,
+        objective_value REAL,
+        makespan REAL,
+        lower_bound REAL,
+        upper_bound REAL,
+        gap REAL,
+        computation_time REAL,
+        ordering TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        profile TEXT
+    )""",
+    "CREATE INDEX IF NOT EXISTS runs_instance ON runs (instance_name, makespan)",
+    "CREATE INDEX IF NOT EXISTS runs_size_class ON runs (algorithm, num_rows, num_cols)",
+    "CREATE INDEX IF NOT EXISTS runs_time ON runs (computation_time)",
+    "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)",
+]
+
+COLUMNS = [
+    "algorithm",
+    "instance_name",
+    "num_rows",
+    "num_cols",
+    "test_number",
+    "objective_value",
+    "makespan",
+    "lower_bound",
+    "upper_bound",
+    "gap",
+    "computation_time",
+    "ordering",
+    "created_at",
+    "profile",
+]
+
+
+def _number(value) -> float | None:
+    # Result dicts use "-" or "N/A" for missing values
+    return value if isinstance(value, (int, float)) else None
+
+
+def parse_instance_name(instance_name: str) -> tuple[int, int, int]:
+    # mp_sp__<rows>_<cols>__<test number>
+    _, size_class, test_number = instance_name.split("__")
+    num_rows, num_cols = size_class.split("_")
+    return int(num_rows), int(num_cols), int(test_number)
+
+
+def simulated_makespan(ids: list[int], filepath: tuple, problems: dict) -> float | None:
+    """Makespan of boarding ``ids``, ``None`` when it is not a full ordering.
+
+    ``problems`` caches the problem of every instance between calls.
+    """
+    from util import AirplaneBoardingProblem
+
+    if filepath not in problems:
+        try:
+            problems[filepath] = AirplaneBoardingProblem(filepath)
+        except FileNotFoundError:
+            problems[filepath] = None
+    abp = problems[filepath]
+    if abp is None or sorted(ids) != list(range(abp.num_passengers)):
+        return None
+    return abp.evaluator.makespan(ids) / 10
+
+
+def _row(result: dict, created_at: float, problems: dict) -> tuple:
+    filepath = parse_instance_name(result["instance_name"])
+    num_rows, num_cols, test_number = filepath
+    return (
+        result["algorithm"],
+        result["instance_name"],
+        num_rows,
+        num_cols,
+        test_number,
+        _number(result.get("objective_value")),
+        simulated_makespan(result.get("order", []), filepath, problems),
+        _number(result.get("lower_bound")),
+        _number(result.get("upper_bound")),
+        _number(result.get("gap")),
+        _number(result.get("computation_time")),
+        json.dumps(result.get("order", [])),
+        created_at,
+        json.dumps(result["profile"]) if result.get("profile") else None,
+    )
+
+
+def _as_result(row: sqlite3.Row) -> dict:
+    result = dict(row)
+    result["order"] = json.loads(result.pop("ordering"))
+    result["profile"] = result["profile"] and json.loads(result["profile"])
+    return result
+
+
+def connect(path: str = DB_PATH) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, timeout=60)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    for statement in SCHEMA:
+        conn.execute(statement)
+    # Databases created before runs were profiled or simulated again
+    columns = [row["name"] for row in conn.execute("PRAGMA table_info(runs)")]
+    if "profile" not in columns:
+        conn.execute("ALTER TABLE runs ADD COLUMN profile TEXT")
+    if "makespan" not in columns:
+        conn.execute("ALTER TABLE runs ADD COLUMN makespan REAL")
+        conn.execute("DROP INDEX runs_instance")
+        conn.execute(SCHEMA[1])
+        problems = {}
+        conn.executemany(
+            "UPDATE runs SET makespan = ? WHERE id = ?",
+            [
+                (
+                    simulated_makespan(
+                        json.loads(row["ordering"]),
+                        (row["num_rows"], row["num_cols"], row["test_number"]),
+                        problems,
+                    ),
+                    row["id"],
+                )
+                for row in conn.execute(
+                    "SELECT id, num_rows, num_cols, test_number, ordering FROM runs"
+                ).fetchall()
+            ],
+        )
+    conn.commit()
+
+    # BEGIN IMMEDIATE takes the write lock, only one process imports
+    conn.execute("BEGIN IMMEDIATE")
+    if conn.execute("SELECT 1 FROM meta WHERE key = 'imported'").fetchone() is None:
+        import_results_tree(conn)
+        conn.execute("INSERT INTO meta VALUES ('imported', ?)", (str(time.time()),))
+    conn.commit()
+    return conn
+
+
+def import_results_tree(conn: sqlite3.Connection, results_dir: str = RESULTS_DIR):
+    """Insert every ``results/<rows>_<cols>/*.json`` run, within the caller's transaction."""
+    rows, problems = [], {}
+    for filename in sorted(glob.glob(os.path.join(results_dir, "*", "*.json"))):
+        with open(filename, "r") as f:
+            rows.append(_row(json.load(f), os.path.getmtime(filename), problems))
+
+    conn.executemany(
+        f"INSERT INTO runs ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+        rows,
+    )
+    return len(rows)
+
+
+def insert_result(conn: sqlite3.Connection, result: dict):
+    with conn:
+        conn.execute(
+            f"INSERT INTO runs ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+            _row(result, time.time(), {}),
+        )
+
+
+def has_result(conn: sqlite3.Connection, instance_name: str, algorithm: str) -> bool:
+    return (
+        conn.execute(
+            "SELECT 1 FROM runs WHERE instance_name = ? AND algorithm = ? LIMIT 1",
+            (instance_name, algorithm),
+        ).fetchone()
+        is not None
+    )
+
+
+def latest_result(
+    conn: sqlite3.Connection, instance_name: str, algorithm: str
+) -> dict | None:
+    row = conn.execute(
+        """SELECT * FROM runs WHERE instance_name = ? AND algorithm = ?
+        ORDER BY created_at DESC, id DESC LIMIT 1""",
+        (instance_name, algorithm),
+    ).fetchone()
+    return row and _as_result(row)
+
+
+def latest_results(
+    conn: sqlite3.Connection, num_rows: int, num_cols: int
+) -> list[dict]:
+    """Most recent run of every solver on every instance of a size class."""
+    rows = conn.execute(
+        """SELECT * FROM runs AS r WHERE num_rows = ? AND num_cols = ?
+        AND id = (
+            SELECT id FROM runs WHERE instance_name = r.instance_name
+            AND algorithm = r.algorithm ORDER BY created_at DESC, id DESC LIMIT 1
+        )
+        ORDER BY algorithm, instance_name""",
+        (num_rows, num_cols),
+    ).fetchall()
+    return [_as_result(row) for row in rows]
+
+
+def best_known(conn: sqlite3.Connection) -> list[dict]:
+    """Lowest simulated makespan of every instance, and the run that found it."""
+    rows = conn.execute("""SELECT * FROM runs AS r WHERE id = (
+            SELECT id FROM runs WHERE instance_name = r.instance_name
+            AND makespan IS NOT NULL
+            ORDER BY makespan, computation_time LIMIT 1
+        )
+        ORDER BY num_rows, num_cols, test_number""").fetchall()
+    return [_as_result(row) for row in rows]
+
+
+def gap_by_solver_and_size(conn: sqlite3.Connection) -> list[dict]:
+    rows = conn.execute("""SELECT algorithm, num_rows, num_cols, COUNT(*) AS runs,
+        AVG(gap) AS mean_gap, MAX(gap) AS max_gap,
+        AVG(computation_time) AS mean_time
+        FROM runs WHERE gap IS NOT NULL
+        GROUP BY algorithm, num_rows, num_cols
+        ORDER BY num_rows, num_cols, algorithm""").fetchall()
+    return [dict(row) for row in rows]
+
+
+def runs_slower_than(conn: sqlite3.Connection, seconds: float) -> list[dict]:
+    rows = conn.execute(
+        "SELECT * FROM runs WHERE computation_time > ? ORDER BY computation_time DESC",
+        (seconds,),
+    ).fetchall()
+    return [_as_result(row) for row in rows]
+
+
+if __name__ == "__main__":
+    conn = connect()
+    query = sys.argv[1] if len(sys.argv) > 1 else "best"
+    if query == "best":
+        for r in best_known(conn):
+            print(
+                f"{r['instance_name']:18} {r['algorithm']:14} {r['makespan']:>10.1f}"
+            )
+    elif query == "gaps":
+        for r in gap_by_solver_and_size(conn):
+            print(
+                f"{r['algorithm']:14} {r['num_rows']}_{r['num_cols']:<4} {r['runs']:>5} {r['mean_gap']:>8.2f} {r['max_gap']:>8.2f} {r['mean_time']:>10.2f}"
+            )
+    elif query == "slower":
+        for r in runs_slower_than(conn, float(sys.argv[2])):
+            print(
+                f"{r['instance_name']:18} {r['algorithm']:14} {r['computation_time']:>10.2f}"
+            )
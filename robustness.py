@@ -0,0 +1,180 @@
+"""Makespan of an ordering over many randomly perturbed boarding scenarios.
+
+The solvers plan with one deterministic set of move and settle times. In a
+scenario every passenger walks at a random speed, stows each of their
+``pax_luggage`` bags in a random time and, when passengers of their row and
+side closer to the aisle already sit down, has to get past them, taking a
+random multiple of their ``times_seat_interference`` per passenger in the
+way. All scenarios of one ordering are boarded together as arrays, one
+passenger at a time as in ``BoardingEvaluator.board``.
+
+    python3 robustness.py 30 6 0 --scenarios 10000
+
+compares the ``MaxSettleRow``, ``OutsideInBTF`` and CP orderings.
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+import profiling
+import util
+from util import AirplaneBoardingProblem, AbpFilepath
+
+NUM_SCENARIOS = 10_000
+SCENARIO_BATCH = 2048  # Scenarios boarded together, bounds the memory used
+PERCENTILES = (50, 90, 95, 99)
+
+MOVE_SIGMA = 0.1  # Of the log of a passenger's walking speed factor
+BAG_SHAPE = 3.0  # Gamma shape of the time to stow one bag, as in the generator
+INTERFERENCE_SHAPE = 2.0  # Gamma shape of getting past one seated passenger
+
+
+class ScenarioEvaluator:
+    """Makespans of orderings under the same ``num_scenarios`` scenarios.
+
+    Scenarios are drawn per passenger id from ``seed``, so every ordering is
+    scored on the same scenarios and differences between orderings are not
+    sampling noise. Times are in tenths, like ``BoardingEvaluator``.
+    """
+
+    def __init__(
+        self,
+        abp: AirplaneBoardingProblem,
+        num_scenarios: int = NUM_SCENARIOS,
+        seed: int = 0,
+        batch_size: int = SCENARIO_BATCH,
+    ):
+        self.evaluator = abp.evaluator
+        self.num_rows = abp.num_rows
+        self.num_passengers = abp.num_passengers
+        self.num_scenarios = num_scenarios
+        self.seed = seed
+        self.batch_size = batch_size
+
+        self.seat_rows = self.evaluator.seat_rows
+        self.cum_move_times = self.evaluator.cum_move_times.astype(np.float64)
+        self.settle_times = self.evaluator.settle_times.astype(np.float64)
+        self.bags = np.maximum(abp.pax_luggage, 1)
+        self.interference_times = abp.times_seat_interference.astype(np.float64)
+
+        # Seats are split evenly on both sides of the aisle
+        columns = np.array([p.column - 1 for p in abp.passengers])
+        half = abp.num_cols // 2
+        self.sides = (columns >= half).astype(np.int64)
+        self.aisle_distance = np.where(
+            columns >= half, columns - half, half - 1 - columns
+        )
+
+    def _scenarios(self):
+        """Batches of (speed, settle, interference) factors, each (P x K)."""
+        rng = np.random.default_rng(self.seed)
+        for start in range(0, self.num_scenarios, self.batch_size):
+            size = (
+                self.num_passengers,
+                min(self.batch_size, self.num_scenarios - start),
+            )
+            speed = rng.lognormal(0.0, MOVE_SIGMA, size)
+            # Sum of one gamma per bag, with the planned settle time as its mean
+            shape = BAG_SHAPE * self.bags[:, None]
+            settle = rng.gamma(shape, 1 / shape, size)
+            interference = rng.gamma(INTERFERENCE_SHAPE, 1 / INTERFERENCE_SHAPE, size)
+            yield start, speed, settle, interference
+
+    def blockers(self, ids) -> np.ndarray:
+        """Passengers already seated between each passenger and the aisle."""
+        blockers = np.zeros(self.num_passengers, dtype=np.int64)
+        seated = {}
+        for p in ids:
+            side = seated.setdefault((self.seat_rows[p], self.sides[p]), [])
+            blockers[p] = sum(d < self.aisle_distance[p] for d in side)
+            side.append(self.aisle_distance[p])
+        return blockers
+
+    def makespans(self, ids) -> np.ndarray:
+        """Makespan of boarding ``ids`` in order in every scenario."""
+        ids = list(ids)
+        blockers = self.blockers(ids)[:, None]
+        makespans = np.empty(self.num_scenarios)
+        for start, speed, settle, interference in self._scenarios():
+            settle_times = (
+                self.settle_times[:, None] * settle
+                + blockers * self.interference_times[:, None] * interference
+            )
+            num_scenarios = speed.shape[1]
+            row_blockage = np.zeros((num_scenarios, self.num_rows + 1))
+            batch_makespans = np.zeros(num_scenarios)
+
+            for p in ids:
+                seat_row = self.seat_rows[p]
+                # Only rows up to the seat are entered, the rest are untouched
+                cum_move_times = np.multiply.outer(
+                    speed[p], self.cum_move_times[p, : seat_row + 1]
+                )
+                enter = row_blockage[:, : seat_row + 1] - cum_move_times
+                np.maximum.accumulate(enter, axis=1, out=enter)
+                enter += cum_move_times
+
+                row_blockage[:, :seat_row] = enter[:, 1:]
+                seated = enter[:, seat_row] + settle_times[p]
+                row_blockage[:, seat_row] = seated
+                np.maximum(batch_makespans, seated, out=batch_makespans)
+
+            makespans[start : start + num_scenarios] = batch_makespans
+        profiling.count("simulations", self.num_scenarios)
+        return makespans
+
+    def summary(self, ids, percentiles=PERCENTILES) -> dict:
+        """Deterministic, mean, standard deviation and percentile makespans."""
+        makespans = self.makespans(ids) / 10
+        return dict(
+            deterministic=self.evaluator.makespan(list(ids)) / 10,
+            mean=makespans.mean(),
+            std=makespans.std(),
+            **{
+                f"p{q}": value
+                for q, value in zip(percentiles, np.percentile(makespans, percentiles))
+            },
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "instance", type=int, nargs="*", default=list(util.CURRENT_ABP_PROBLEM)
+    )
+    parser.add_argument("--scenarios", type=int, default=NUM_SCENARIOS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cp-time-limit", type=float, default=30)
+    args = parser.parse_args()
+
+    from engines.cp import CP
+    from engines.max_settle_row import MaxSettleRow
+    from engines.outside_in_btf import OutsideInBTF
+
+    abp = AirplaneBoardingProblem(AbpFilepath(*args.instance))
+    cp = CP()
+    cp.time_limit = args.cp_time_limit
+    solvers = {"MaxSettleRow": MaxSettleRow(), "OutsideInBTF": OutsideInBTF(), "CP": cp}
+    orderings = {
+        name: [p.id for p in solver.solve(abp).ordering if p]
+        for name, solver in solvers.items()
+    }
+
+    scenarios = ScenarioEvaluator(abp, args.scenarios, args.seed)
+    columns = ["deterministic", "mean", "std"] + [f"p{q}" for q in PERCENTILES]
+    print(
+        f"{'ordering':14}" + "".join(f"{c:>14}" for c in columns) + f"{'time (s)':>10}"
+    )
+    for name, ids in orderings.items():
+        start = time.perf_counter()
+        summary = scenarios.summary(ids)
+        elapsed = time.perf_counter() - start
+        print(
+            f"{name:14}"
+            + "".join(f"{summary[c]:>14.1f}" for c in columns)
+            + f"{elapsed:>10.2f}"
+        )
@@ -0,0 +1,219 @@
+"""Long-running solve service, one JSON request per line.
+
+    python3 service.py                       # requests on stdin, responses on stdout
+    python3 service.py --socket /tmp/abp.sock --workers 8
+
+Requests, ``id`` is echoed back and names the solve for ``cancel``, a solve
+without one is rejected:
+
+    {"id": 1, "op": "solve", "engine": "cp", "instance": [30, 6, 0], "time_limit": 10}
+    {"id": 2, "op": "solve", "engine": "max_settle_row", "instance": [60, 10, 0], "synthetic": true}
+    {"id": 3, "op": "cancel", "target": 1}
+    {"id": 4, "op": "stats"}
+
+Engines are imported once at startup, problems (with their evaluator tables)
+and the solutions of the deterministic heuristics are kept between requests,
+so a heuristic request on a seen instance is answered in milliseconds.
+Solves run concurrently on a thread pool, a cancelled anytime engine answers
+with its best ordering so far. Responses may come back out of order.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import socketserver
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+import solve
+from util import AbpSolution, AirplaneBoardingProblem
+
+PROBLEM_CACHE_SIZE = 256
+# Deterministic engines, their solutions are reused per instance content.
+# best_heuristic is not, it may return the mutable best known ordering
+CACHED_ENGINES = {"max_settle_row", "outside_in_btf"}
+# Quick requests should not queue behind long solves, even on a small box
+WORKERS = max(os.cpu_count(), 4)
+
+
+@lru_cache(maxsize=PROBLEM_CACHE_SIZE)
+def cached_problem(instance: tuple, synthetic: bool) -> AirplaneBoardingProblem:
+    return solve.load_problem(instance, synthetic)
+
+
+class SolveService:
+    def __init__(self, workers: int = WORKERS):
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+        self.lock = threading.Lock()
+        # Solve number -> (request id, stop event), clients may reuse ids
+        self.running: dict[int, tuple] = {}
+        self.solves = itertools.count()
+        self.solutions: dict[tuple, AbpSolution] = {}  # (engine, content hash)
+        self.served = 0
+        self.engines = {}
+        for name in solve.ENGINES:
+            try:
+                self.engines[name] = solve.load_engine(name)
+            except ImportError as e:
+                print(f"Engine {name} unavailable: {e!r}", file=sys.stderr)
+
+    def handle(self, request: dict, respond):
+        """Answers ``request`` through ``respond``, solves on the pool."""
+        op = request.get("op", "solve")
+        if op == "solve":
+            if request.get("id") is None:
+                respond(dict(id=None, status="error", error="solve without an id"))
+                return
+            stop_event = threading.Event()
+            with self.lock:
+                solve_number = next(self.solves)
+                self.running[solve_number] = (request["id"], stop_event)
+            self.pool.submit(self._solve, request, solve_number, stop_event, respond)
+        elif op == "cancel":
+            # Every running solve with the target id
+            with self.lock:
+                stop_events = [
+                    stop_event
+                    for request_id, stop_event in self.running.values()
+                    if request_id == request.get("target")
+                ]
+            for stop_event in stop_events:
+                stop_event.set()
+            respond(dict(id=request.get("id"), status="ok", found=bool(stop_events)))
+        elif op == "stats":
+            with self.lock:
+                running = len(self.running)
+            respond(
+                dict(
+                    id=request.get("id"),
+                    status="ok",
+                    engines=sorted(self.engines),
+                    running=running,
+                    served=self.served,
+                    problems=cached_problem.cache_info().currsize,
+                    solutions=len(self.solutions),
+                )
+            )
+        else:
+            respond(dict(id=request.get("id"), status="error", error=f"bad op {op!r}"))
+
+    def _solve(
+        self,
+        request: dict,
+        solve_number: int,
+        stop_event: threading.Event,
+        respond,
+    ):
+        start = time.perf_counter()
+        response = dict(id=request.get("id"))
+        try:
+            response.update(self._solution_fields(request, stop_event))
+            response["status"] = "cancelled" if stop_event.is_set() else "done"
+        except Exception as e:
+            response.update(status="error", error=repr(e))
+        finally:
+            with self.lock:
+                del self.running[solve_number]
+                self.served += 1
+        response["latency"] = time.perf_counter() - start
+        respond(response)
+
+    def _solution_fields(self, request: dict, stop_event: threading.Event) -> dict:
+        name = request["engine"]
+        if name not in self.engines:
+            raise ValueError(f"unknown engine {name!r}")
+        abp = cached_problem(
+            tuple(request["instance"]), bool(request.get("synthetic", False))
+        )
+
+        key = (name, abp.evaluator.content_hash)
+        solution = self.solutions.get(key) if name in CACHED_ENGINES else None
+        cached = solution is not None
+        if solution is None and stop_event.is_set():
+            return dict(makespan=None, order=None, cached=False)  # Never started
+        if solution is None:
+            solver = self.engines[name]()
+            solver.stop_event = stop_event
+            if request.get("time_limit") is not None:
+                solver.time_limit = request["time_limit"]
+            if request.get("threads") is not None:
+                solver.threads = request["threads"]
+            solution = solver.solve(abp)
+            if name in CACHED_ENGINES:
+                self.solutions[key] = solution
+
+        return dict(
+            makespan=solution.makespan,
+            lower_bound=solution.lower_bound,
+            upper_bound=solution.upper_bound,
+            computation_time=solution.computation_time,
+            order=[p.id for p in solution.ordering if p],
+            cached=cached,
+        )
+
+
+def serve_stdio(service: SolveService):
+    # Engines print their logs, only responses may reach the real stdout
+    out = os.fdopen(os.dup(sys.stdout.fileno()), "w")
+    sys.stdout.flush()
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    out_lock = threading.Lock()
+
+    def respond(response: dict):
+        with out_lock:
+            out.write(json.dumps(response) + "\n")
+            out.flush()
+
+    for line in sys.stdin:
+        if line.strip():
+            try:
+                service.handle(json.loads(line), respond)
+            except json.JSONDecodeError as e:
+                respond(dict(id=None, status="error", error=repr(e)))
+    service.pool.shutdown(wait=True)
+
+
+def serve_socket(service: SolveService, path: str):
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            write_lock = threading.Lock()
+
+            def respond(response: dict):
+                with write_lock:
+                    try:
+                        self.wfile.write((json.dumps(response) + "\n").encode())
+                        self.wfile.flush()
+                    except (BrokenPipeError, ValueError):
+                        pass  # Client went away before its answer
+
+            for line in self.rfile:
+                if line.strip():
+                    try:
+                        service.handle(json.loads(line), respond)
+                    except json.JSONDecodeError as e:
+                        respond(dict(id=None, status="error", error=repr(e)))
+
+    if os.path.exists(path):
+        os.remove(path)
+    with socketserver.ThreadingUnixStreamServer(path, Handler) as server:
+        print(f"Serving on {path}", file=sys.stderr)
+        server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--socket", default=None, help="serve on this Unix socket")
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    args = parser.parse_args()
+
+    service = SolveService(args.workers)
+    if args.socket:
+        serve_socket(service, args.socket)
+    else:
+        serve_stdio(service)
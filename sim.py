@@ -2,94 +2,213 @@
 
 import os
 
+import best_known
 import util
 from engines import cp
 from engines.cp import CP
+from engines.genetic import Genetic
 from engines.max_settle_row import MaxSettleRow
 from engines.mip import MIP
 from engines.outside_in_btf import OutsideInBTF
 from engines.random_ordering import Random
+from engines.simulated_annealing import SimulatedAnnealing
 from util import AirplaneBoardingProblem, AbpFilepath, AbpSolver, AbpSolution
 import re
-import json
+import argparse
+import results_store
+from instance_store import instance_name
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
 
 abp_slug = lambda name: name.lower()
 
 INVALID = "-"
 
 
-def run_solvers_on_abp(filepath: AbpFilepath):
-    # Run solvers on filepath and make a json
-    solvers: list[AbpSolver] = [CP(), MIP(), Random(), OutsideInBTF(), MaxSettleRow()]
-    # solvers = [CP()]
-    for solver in solvers:
-        abp = AirplaneBoardingProblem(filepath)
-        solution: AbpSolution = solver.solve(abp)
-
-        instance_name = (
-            f"mp_sp__{filepath.num_rows}_{filepath.num_columns}__{filepath.test_number}"
+SIZE_CLASSES = [
+    (10, 2),
+    (10, 4),
+    (10, 6),
+    (20, 2),
+    (20, 4),
+    (20, 6),
+    (30, 2),
+    (30, 4),
+    (30, 6),
+]
+SOLVERS: list[type[AbpSolver]] = [
+    CP,
+    MIP,
+    Random,
+    OutsideInBTF,
+    MaxSettleRow,
+    SimulatedAnnealing,
+    Genetic,
+]
+
+
+def run_solver_on_abp(
+    filepath: AbpFilepath,
+    solver: type[AbpSolver],
+    profile_dir: str | None = None,
+    use_best_known: bool = False,
+) -> dict:
+    # With use_best_known the run starts from, and offers its ordering to,
+    # the best known store. Set here as sweeps run this on worker processes
+    if use_best_known:
+        best_known.enabled = True
+    abp = AirplaneBoardingProblem(filepath)
+    slug_algorithm = abp_slug(solver.__name__)
+    solver_instance = solver()
+    if profile_dir is not None:
+        solver_instance.profile_path = os.path.join(
+            profile_dir, f"{slug_algorithm}__{instance_name(filepath)}.prof"
         )
-        slug_algorithm = abp_slug(type(solver).__name__)
-        result = dict(
-            algorithm=slug_algorithm,
-            computation_time=solution.computation_time,
-            instance_name=instance_name,
-            objective_value=solution.makespan,
-            order=[p.id for p in solution.ordering if p],
-            lower_bound=solution.lower_bound or "-",
-            upper_bound=solution.upper_bound or "-",
-            gap=(
+    solution: AbpSolution = solver_instance.solve(abp)
+    order = [p.id for p in solution.ordering if p]
+    if use_best_known and best_known.update(abp, order, slug_algorithm):
+        print(f"New best known makespan {solution.makespan} by {slug_algorithm}")
+
+    result = dict(
+        algorithm=slug_algorithm,
+        computation_time=solution.computation_time,
+        instance_name=instance_name(filepath),
+        objective_value=solution.makespan,
+        order=order,
+        lower_bound=solution.lower_bound or "-",
+        upper_bound=solution.upper_bound or "-",
+        gap=(
+            (
                 (
-                    (
-                        abs(solution.upper_bound - solution.lower_bound)
-                        / abs(solution.upper_bound)
-                    )
-                    * 100
+                    abs(solution.upper_bound - solution.lower_bound)
+                    / abs(solution.upper_bound)
                 )
-                if solution.lower_bound
-                else "-"
-            ),
-        )
+                * 100
+            )
+            if solution.lower_bound
+            else "-"
+        ),
+        profile=solution.profile,
+    )
 
-        with open(
-            f"results/{filepath.num_rows}_{filepath.num_columns}/{slug_algorithm}__mp_sp__{filepath.num_rows}_{filepath.num_columns}__{filepath.test_number}.json",
-            "w+",
-        ) as f:
-            json.dump(result, f)
+    conn = results_store.connect()
+    results_store.insert_result(conn, result)
+    conn.close()
+    return result
+
+
+def run_solvers_on_abp(
+    filepath: AbpFilepath,
+    profile_dir: str | None = None,
+    use_best_known: bool = False,
+):
+    # Run solvers on filepath and make a json
+    for solver in SOLVERS:
+        run_solver_on_abp(filepath, solver, profile_dir, use_best_known)
+
+
+def run_sweep(
+    filepaths: list[AbpFilepath],
+    solvers: list[type[AbpSolver]] = SOLVERS,
+    cores: int | None = None,
+    overwrite: bool = False,
+    profile_dir: str | None = None,
+    use_best_known: bool = False,
+):
+    """Run every (instance, solver) job on a process pool.
+
+    Jobs are only started while the threads of the running solvers fit in
+    ``cores``, heaviest first. Jobs that already have a run in the results
+    store are skipped, so a killed sweep picks up where it stopped when run
+    again.
+    """
+    cores = cores or os.cpu_count()
+    conn = results_store.connect()
+    jobs = [
+        (filepath, solver)
+        for filepath in filepaths
+        for solver in solvers
+        if overwrite
+        or not results_store.has_result(
+            conn, instance_name(filepath), abp_slug(solver.__name__)
+        )
+    ]
+    conn.close()
+    jobs.sort(key=lambda job: job[1].threads)
+    print(f"{len(jobs)} jobs to run on {cores} cores")
+
+    running = {}
+    with ProcessPoolExecutor(max_workers=cores) as pool:
+        while jobs or running:
+            free_cores = cores - sum(solver.threads for _, solver in running.values())
+            # Heaviest job that fits, a solver wider than the box runs alone
+            for job in reversed(jobs):
+                if job[1].threads <= free_cores or not running:
+                    jobs.remove(job)
+                    running[
+                        pool.submit(
+                            run_solver_on_abp, *job, profile_dir, use_best_known
+                        )
+                    ] = job
+                    break
+            else:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    filepath, solver = running.pop(future)
+                    try:
+                        future.result()
+                        print(f"Finished {solver.__name__} on {filepath}")
+                    except Exception as e:
+                        print(f"Failed {solver.__name__} on {filepath}: {e!r}")
 
 
 def print_data_set_results(num_rows: int, num_cols: int):
-    folder_path = f"results/{num_rows}_{num_cols}"
     print(
-        f"{'file':38} {'lower_bound':>12} {'upper_bound':>12} {'gap (%)':>8} {'objective':>12} {'time (s)':>10}"
+        f"{'run':38} {'lower_bound':>12} {'upper_bound':>12} {'gap (%)':>8} {'objective':>12} {'time (s)':>10}"
     )
 
-    round_decimal = lambda val: (
-        f"{val:.2f}" if not (val in ["N/A", INVALID]) else INVALID
-    )
-    for filename in sorted(os.listdir(folder_path)):
-        if not filename.endswith(".json"):
-            continue
-        file_path = os.path.join(folder_path, filename)
-
-        with open(file_path, "r") as file:
-            data = json.load(file)
-
-            lb = round_decimal(data.get("lower_bound", INVALID))
-            ub = round_decimal(data.get("upper_bound", INVALID))
-            gap = round_decimal(data.get("gap", INVALID))
-            objective_value = round_decimal(data.get("objective_value", INVALID))
-            computation_time = round_decimal(data.get("computation_time", INVALID))
-
-            print(
-                f"{filename:38} {lb:>12} {ub:>12} {gap:>8} {objective_value:>12} {computation_time:>10}"
-            )
+    round_decimal = lambda val: f"{val:.2f}" if val is not None else INVALID
+    conn = results_store.connect()
+    for data in results_store.latest_results(conn, num_rows, num_cols):
+        run = f"{data['algorithm']}__{data['instance_name']}"
+        lb = round_decimal(data["lower_bound"])
+        ub = round_decimal(data["upper_bound"])
+        gap = round_decimal(data["gap"])
+        objective_value = round_decimal(data["objective_value"])
+        computation_time = round_decimal(data["computation_time"])
+
+        print(
+            f"{run:38} {lb:>12} {ub:>12} {gap:>8} {objective_value:>12} {computation_time:>10}"
+        )
+    conn.close()
 
 
 if __name__ == "__main__":
-    # [(10, 4), (10, 6), (20, 4), (20, 6), (30, 2), (30, 4), (30, 6)]
-    # for num_rows, num_cols in [(10, 2)]:
-    #     for test_number in range(10):
-    #         filepath = AbpFilepath(num_rows, num_cols, test_number)
-    #         run_solvers_on_abp(filepath)
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sweep", action="store_true", help="run all instances")
+    parser.add_argument("--cores", type=int, default=None)
+    parser.add_argument("--overwrite", action="store_true")
+    parser.add_argument(
+        "--profile-dir", default=None, help="dump cProfile stats of every run here"
+    )
+    parser.add_argument(
+        "--best-known",
+        action="store_true",
+        help="start from and update the best known orderings",
+    )
+    args = parser.parse_args()
+    if args.profile_dir is not None:
+        os.makedirs(args.profile_dir, exist_ok=True)
+
+    if args.sweep:
+        run_sweep(
+            [
+                AbpFilepath(num_rows, num_cols, test_number)
+                for num_rows, num_cols in SIZE_CLASSES
+                for test_number in range(10)
+            ],
+            cores=args.cores,
+            overwrite=args.overwrite,
+            profile_dir=args.profile_dir,
+            use_best_known=args.best_known,
+        )
     print_data_set_results(10, 4)
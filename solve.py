@@ -0,0 +1,128 @@
+"""Solve one instance with a chosen engine, without loading any plotting library.
+
+    python3 solve.py cp 30 6 0 --time-limit 60
+    python3 solve.py simulated_annealing 10 2 6 --json solution.json
+    python3 solve.py max_settle_row --synthetic 60 10 0
+    python3 solve.py lns 30 6 0 --best-known
+
+Only the chosen engine is imported, so heuristics never load OR-Tools or
+Gurobi. ``--plot`` shows the seat plot and Gantt chart of the solution,
+``--best-known`` starts from the stored best known ordering and stores the
+solution when it improves on it.
+"""
+
+import argparse
+import importlib
+import json
+
+import best_known
+from util import AirplaneBoardingProblem, AbpFilepath, AbpSolver, CURRENT_ABP_PROBLEM
+
+# Engine name -> (module, solver class)
+ENGINES = {
+    "cp": ("engines.cp", "CP"),
+    "strong_cp": ("engines.cp", "StrongCP"),
+    "mip": ("engines.mip", "MIP"),
+    "mip_sparse": ("engines.mip_sparse", "SparseMIP"),
+    "lns": ("engines.lns", "LNS"),
+    "simulated_annealing": ("engines.simulated_annealing", "SimulatedAnnealing"),
+    "genetic": ("engines.genetic", "Genetic"),
+    "group_policy": ("engines.group_policy", "GroupPolicy"),
+    "best_heuristic": ("engines.heuristic_search", "BestHeuristic"),
+    "max_settle_row": ("engines.max_settle_row", "MaxSettleRow"),
+    "outside_in_btf": ("engines.outside_in_btf", "OutsideInBTF"),
+    "random": ("engines.random_ordering", "Random"),
+}
+
+
+def load_engine(name: str) -> type[AbpSolver]:
+    module, solver = ENGINES[name]
+    return getattr(importlib.import_module(module), solver)
+
+
+def load_problem(instance, synthetic: bool = False) -> AirplaneBoardingProblem:
+    # instance is (rows, columns, test number), the seed for synthetic ones
+    if synthetic:
+        from instance_generator import synthetic_problem
+
+        return synthetic_problem(*instance)
+    return AirplaneBoardingProblem(AbpFilepath(*instance))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("engine", choices=ENGINES)
+    parser.add_argument(
+        "instance",
+        type=int,
+        nargs="*",
+        default=list(CURRENT_ABP_PROBLEM),
+        help="rows, columns and test number (seed with --synthetic)",
+    )
+    parser.add_argument("--synthetic", action="store_true")
+    parser.add_argument("--time-limit", type=float, default=None)
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--profile", default=None, help="dump cProfile stats here")
+    parser.add_argument("--json", default=None, help="write the solution here")
+    parser.add_argument("--plot", action="store_true")
+    parser.add_argument(
+        "--multi-start",
+        action="store_true",
+        help="bound CP and MIP with the parallel multi-start heuristic",
+    )
+    parser.add_argument(
+        "--best-known",
+        action="store_true",
+        help="start from and update the best known ordering",
+    )
+    args = parser.parse_intermixed_args()
+    if len(args.instance) != 3:
+        parser.error("instance is rows, columns and test number")
+
+    best_known.enabled = args.best_known
+    abp = load_problem(args.instance, args.synthetic)
+    solver = load_engine(args.engine)()
+    if args.time_limit is not None:
+        solver.time_limit = args.time_limit
+    if args.threads is not None:
+        solver.threads = args.threads
+    solver.profile_path = args.profile
+    if args.multi_start:
+        solver.multi_start = True
+
+    solution = solver.solve(abp)
+    print(
+        f"{args.engine}: makespan {solution.makespan} in {solution.computation_time:.2f}s"
+    )
+    if args.best_known and best_known.update(
+        abp, [p.id for p in solution.ordering if p], args.engine
+    ):
+        print(f"New best known makespan {solution.makespan}")
+    if solution.lower_bound is not None:
+        print(f"Bounds [{solution.lower_bound}, {solution.upper_bound}]")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(
+                dict(
+                    engine=args.engine,
+                    instance=args.instance,
+                    makespan=solution.makespan,
+                    lower_bound=solution.lower_bound,
+                    upper_bound=solution.upper_bound,
+                    computation_time=solution.computation_time,
+                    order=[p.id for p in solution.ordering if p],
+                    profile=solution.profile,
+                ),
+                f,
+                indent=2,
+            )
+    if args.plot:
+        solution.make_solution_plot()
+        solution.make_gantt_chart()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# Hack import trick for relative imports
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+import pytest
+
+from instance_generator import synthetic_problem
+from util import AirplaneBoardingProblem, AbpFilepath
+
+INSTANCES = [AbpFilepath(10, 2, 6), AbpFilepath(10, 4, 0), AbpFilepath(20, 6, 3)]
+NUM_ORDERINGS = 20
+
+
+def simulate_boarding(abp: AirplaneBoardingProblem, ids) -> tuple[int, list]:
+    """Makespan and row entry times of the original ``AbpSolution.simulate_boarding``."""
+    passenger_seated_times = [0 for _ in ids]
+    passenger_enter_row = []
+    row_blockage = [0 for _ in range(abp.num_rows + 1)]
+
+    for i, p in enumerate(abp.passengers[j] for j in ids):
+        passenger_enter_row.append([0 for _ in range(p.row + 1)])
+
+        for row in range(p.row + 1):
+            # Maximum of either passenger moving or when the row becomes free
+            passenger_enter_row[i][row] = (
+                row_blockage[0]
+                if row == 0
+                else max(
+                    passenger_enter_row[i][row - 1] + p.move_times[row - 2],
+                    row_blockage[row],
+                )
+            )
+
+            if row > 0:
+                row_blockage[row - 1] = passenger_enter_row[i][row]
+
+            if row == p.row:
+                passenger_seated_time = passenger_enter_row[i][row] + p.settle_time
+                row_blockage[row] = passenger_seated_time
+                passenger_seated_times[i] = passenger_seated_time
+
+    return int(max(passenger_seated_times, default=0)), passenger_enter_row
+
+
+@pytest.fixture(
+    params=INSTANCES + ["synthetic"],
+    ids=lambda f: f if isinstance(f, str) else "{}_{}__{}".format(*f),
+)
+def abp(request) -> AirplaneBoardingProblem:
+    if request.param == "synthetic":
+        return synthetic_problem(7, 4, 0)
+    return AirplaneBoardingProblem(request.param)
+
+
+@pytest.fixture
+def orderings(abp) -> np.ndarray:
+    """Random orderings of the passengers of ``abp``, one per row."""
+    rng = np.random.default_rng(abp.num_passengers)
+    return np.array(
+        [rng.permutation(abp.num_passengers) for _ in range(NUM_ORDERINGS)]
+    )
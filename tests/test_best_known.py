@@ -0,0 +1,99 @@
+import functools
+import itertools
+import sqlite3
+
+import numpy as np
+import pytest
+
+import best_known
+from engines.heuristic_search import best_known_or, multi_start_heuristic
+from engines.max_settle_row import MaxSettleRow
+from instance_generator import synthetic_problem
+from util import AbpSolution
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    path = str(tmp_path / "best_known.db")
+    # Already imported, so connect leaves results.db alone
+    with sqlite3.connect(path) as conn:
+        conn.execute(best_known.SCHEMA[-1])
+        conn.execute("INSERT INTO meta VALUES ('imported', '0')")
+    monkeypatch.setattr(
+        best_known, "connect", functools.partial(best_known.connect, path)
+    )
+    monkeypatch.setattr(best_known, "enabled", True)
+    return path
+
+
+@pytest.fixture
+def small_abp():
+    # MaxSettleRow is not optimal here
+    return synthetic_problem(4, 2, 0)
+
+
+def optimum(abp) -> list[int]:
+    orderings = np.array(list(itertools.permutations(range(abp.num_passengers))))
+    return orderings[abp.evaluator.batch_makespans(orderings).argmin()].tolist()
+
+
+def test_disabled_by_default(abp):
+    assert not best_known.enabled
+    assert best_known.lookup(abp) is None
+    assert not best_known.update(abp, list(range(abp.num_passengers)))
+
+
+def test_update_keeps_the_best(store, abp, orderings):
+    evaluator = abp.evaluator
+    ids = sorted(orderings.tolist(), key=evaluator.makespan)
+    assert best_known.lookup(abp) is None
+
+    assert best_known.update(abp, ids[5], "random")
+    assert best_known.lookup(abp) == ids[5]
+    # Worse and equal orderings are not stored
+    assert not best_known.update(abp, ids[-1], "random")
+    assert not best_known.update(abp, ids[5], "random")
+    # Only full orderings are stored
+    assert not best_known.update(abp, ids[0][1:], "random")
+    assert best_known.update(abp, ids[0], "random")
+    assert best_known.lookup(abp) == ids[0]
+
+    (row,) = sqlite3.connect(store).execute("SELECT makespan FROM best_known")
+    assert row[0] == evaluator.makespan(ids[0])
+
+
+def test_keyed_by_instance_content(store):
+    abp = synthetic_problem(4, 2, 0)
+    ids = list(range(abp.num_passengers))
+    assert best_known.update(abp, ids)
+    # The same instance built again finds the entry, another one does not
+    assert best_known.lookup(synthetic_problem(4, 2, 0)) == ids
+    assert best_known.lookup(synthetic_problem(4, 2, 1)) is None
+
+
+def test_best_known_or(store, small_abp):
+    heuristic = MaxSettleRow().solve(small_abp)
+    assert best_known_or(small_abp, heuristic) is heuristic
+
+    ids = optimum(small_abp)
+    best_known.update(small_abp, ids)
+    stored = best_known_or(small_abp, heuristic)
+    assert [p.id for p in stored.ordering] == ids
+    assert stored.makespan < heuristic.makespan
+
+    better = AbpSolution(small_abp, [small_abp.passengers[i] for i in ids])
+    assert best_known_or(small_abp, better) is better
+
+
+def test_multi_start_returns_best_known(store, small_abp):
+    # Out of time, only the first start runs and 2-opt stops at once
+    heuristic = MaxSettleRow().solve(small_abp)
+    solution, stats = multi_start_heuristic(small_abp, workers=1, time_limit=0)
+    assert len(stats) == 1
+    assert solution.makespan == heuristic.makespan
+
+    ids = optimum(small_abp)
+    best_known.update(small_abp, ids)
+    solution, _ = multi_start_heuristic(small_abp, workers=1, time_limit=0)
+    assert [p.id for p in solution.ordering] == ids
+    assert solution.makespan < heuristic.makespan
@@ -0,0 +1,49 @@
+import itertools
+
+import pytest
+
+import bounds
+from conftest import simulate_boarding
+from engines.max_settle_row import MaxSettleRow
+from engines.outside_in_btf import OutsideInBTF
+from instance_generator import synthetic_problem
+
+
+def test_bounds_below_random_orderings(abp, orderings):
+    lower_bounds = bounds.lower_bounds(abp)
+    assert bounds.lower_bound(abp) == max(lower_bounds.values())
+    makespan = min(simulate_boarding(abp, ids)[0] for ids in orderings.tolist())
+    for name, bound in lower_bounds.items():
+        assert 0 < bound <= makespan, name
+
+
+@pytest.mark.parametrize("heuristic", [MaxSettleRow, OutsideInBTF])
+def test_bound_below_heuristics(abp, heuristic):
+    ids = [p.id for p in heuristic().solve(abp).ordering]
+    assert bounds.lower_bound(abp) <= simulate_boarding(abp, ids)[0]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_bound_below_optimum(seed):
+    # Every ordering of 6 passengers
+    abp = synthetic_problem(3, 2, seed)
+    optimum = min(
+        abp.evaluator.makespan(ids)
+        for ids in itertools.permutations(range(abp.num_passengers))
+    )
+    for name, bound in bounds.lower_bounds(abp).items():
+        assert bound <= optimum, name
+
+
+@pytest.mark.parametrize(
+    "jobs, expected",
+    [
+        ([(2, 3, 4)], 9),
+        # The second job preempts the first for its longer tail
+        ([(0, 5, 0), (1, 1, 10)], 12),
+        # Idle until the last release
+        ([(0, 1, 0), (10, 2, 1)], 13),
+    ],
+)
+def test_preemptive_schedule_bound(jobs, expected):
+    assert bounds.preemptive_schedule_bound(jobs) == expected
@@ -0,0 +1,119 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import bounds
+from conftest import simulate_boarding
+
+
+def test_makespan_matches_simulation(abp, orderings):
+    evaluator = abp.evaluator
+    lower_bound = bounds.lower_bound(abp)
+    for ids in orderings.tolist():
+        makespan, _ = simulate_boarding(abp, ids)
+        assert evaluator.makespan(ids) == makespan
+        assert lower_bound <= makespan
+
+
+def test_enter_times_match_simulation(abp, orderings):
+    for ids in orderings.tolist():
+        assert abp.evaluator.enter_times(ids) == simulate_boarding(abp, ids)[1]
+
+
+def test_makespan_from_prefix_states(abp, orderings):
+    evaluator = abp.evaluator
+    for ids in orderings[:5].tolist():
+        makespan = evaluator.makespan(ids)
+        states = evaluator.prefix_states(ids)
+        assert len(states) == len(ids) + 1
+        assert states[-1][1] == makespan
+        for start, state in enumerate(states):
+            assert evaluator.makespan_from(ids, start, state) == makespan
+            # Refreshing from a checkpoint gives the same states
+            assert evaluator.prefix_states(ids, start, state) == states[start:]
+
+        # Stops once the makespan reaches the cutoff
+        assert evaluator.makespan_from(ids, 0, states[0], cutoff=makespan) is None
+        assert evaluator.makespan_from(ids, 0, states[0], cutoff=makespan + 1) == (
+            makespan
+        )
+
+
+def test_batch_makespans(abp, orderings):
+    evaluator = abp.evaluator
+    expected = [simulate_boarding(abp, ids)[0] for ids in orderings.tolist()]
+    assert evaluator.batch_makespans(orderings).tolist() == expected
+    assert evaluator.batch_makespans(orderings, batch_size=3).tolist() == expected
+
+    # Suffixes boarding after a shared prefix
+    start = abp.num_passengers // 2
+    prefix = orderings[0, :start]
+    suffixes = np.array(
+        [np.concatenate([prefix, np.setdiff1d(ids, prefix)]) for ids in orderings]
+    )
+    state = evaluator.prefix_states(prefix.tolist())[-1]
+    assert evaluator.batch_makespans(suffixes[:, start:], state=state).tolist() == [
+        evaluator.makespan(ids) for ids in suffixes.tolist()
+    ]
+
+
+def test_batch_states_match_prefix_states(abp, orderings):
+    evaluator = abp.evaluator
+    row_blockage, makespans = evaluator.batch_states(orderings)
+    for ids, blockage, makespan in zip(orderings.tolist(), row_blockage, makespans):
+        assert (tuple(blockage.tolist()), makespan) == evaluator.prefix_states(ids)[-1]
+
+
+def test_makespan_across_threads(abp, orderings):
+    # Every thread boards in its own row blockage buffer
+    evaluator = abp.evaluator
+    expected = [simulate_boarding(abp, ids)[0] for ids in orderings.tolist()]
+    with ThreadPoolExecutor(4) as executor:
+        for _ in range(5):
+            assert list(executor.map(evaluator.makespan, orderings.tolist())) == (
+                expected
+            )
+
+
+def test_interchangeable_passengers(abp, orderings):
+    # Swapping passengers with the same profile never changes the makespan
+    evaluator = abp.evaluator
+    for ids in orderings[:5].tolist():
+        makespan = evaluator.makespan(ids)
+        for i in range(len(ids)):
+            for j in range(i + 1, len(ids)):
+                if evaluator.profile_ids[ids[i]] != evaluator.profile_ids[ids[j]]:
+                    continue
+                ids[i], ids[j] = ids[j], ids[i]
+                assert evaluator.makespan(ids) == makespan
+                ids[i], ids[j] = ids[j], ids[i]
+
+
+def test_tail_weights(abp, orderings):
+    # max(makespan, max(w[k] + row_blockage)) after any prefix is the makespan
+    evaluator = abp.evaluator
+    for ids in orderings[:5].tolist():
+        makespan = evaluator.makespan(ids)
+        weights = evaluator.tail_weights(ids)
+        assert weights.shape == (len(ids) + 1, abp.num_rows + 1)
+        for (row_blockage, prefix_makespan), w in zip(
+            evaluator.prefix_states(ids), weights
+        ):
+            assert max(prefix_makespan, (w + row_blockage).max()) == makespan
+
+
+def test_tail_weights_refresh(abp, orderings):
+    # Weights before a changed segment are refreshed from the weights after it
+    evaluator = abp.evaluator
+    ids = orderings[0].tolist()
+    start, end = len(ids) // 4, len(ids) // 2
+    ids[start:end] = ids[start:end][::-1]
+    weights = evaluator.tail_weights(ids)
+    # Without a tail the ordering ends at end
+    assert np.array_equal(
+        evaluator.tail_weights(ids, start, end),
+        evaluator.tail_weights(ids[:end])[start:],
+    )
+    assert np.array_equal(
+        evaluator.tail_weights(ids, 0, end, tail=weights[end]), weights[: end + 1]
+    )
@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+import bounds
+from conftest import simulate_boarding
+from engines.genetic import (
+    CROSSOVERS,
+    Genetic,
+    _cut_points,
+    evolve,
+    mutate,
+    order_crossover,
+    partially_mapped_crossover,
+)
+from engines.max_settle_row import MaxSettleRow
+
+
+def is_permutation(population: np.ndarray) -> bool:
+    return bool(
+        (np.sort(population, axis=1) == np.arange(population.shape[1])).all()
+    )
+
+
+@pytest.mark.parametrize("crossover", CROSSOVERS)
+def test_crossover_children_are_permutations(crossover, orderings):
+    rng = np.random.default_rng(0)
+    for _ in range(10):
+        children = CROSSOVERS[crossover](orderings, orderings[::-1], rng)
+        assert children.shape == orderings.shape
+        assert is_permutation(children)
+
+
+@pytest.mark.parametrize("crossover", CROSSOVERS)
+def test_crossover_of_equal_parents(crossover, orderings):
+    children = CROSSOVERS[crossover](orderings, orderings, np.random.default_rng(0))
+    assert np.array_equal(children, orderings)
+
+
+def test_order_crossover_keeps_slice_and_order(orderings):
+    parents_a, parents_b = orderings, np.roll(orderings, 1, axis=0)
+    children = order_crossover(parents_a, parents_b, np.random.default_rng(1))
+    lo, hi = _cut_points(np.random.default_rng(1), *orderings.shape)
+    for child, a, b, l, h in zip(children, parents_a, parents_b, lo[:, 0], hi[:, 0]):
+        assert np.array_equal(child[l:h], a[l:h])
+        # The rest in the order of b
+        rest = np.concatenate([child[:l], child[h:]])
+        assert np.array_equal(rest, b[~np.isin(b, a[l:h])])
+
+
+def test_partially_mapped_crossover_keeps_slice(orderings):
+    parents_a, parents_b = orderings, np.roll(orderings, 1, axis=0)
+    children = partially_mapped_crossover(
+        parents_a, parents_b, np.random.default_rng(1)
+    )
+    lo, hi = _cut_points(np.random.default_rng(1), *orderings.shape)
+    for child, a, b, l, h in zip(children, parents_a, parents_b, lo[:, 0], hi[:, 0]):
+        assert np.array_equal(child[l:h], a[l:h])
+        # Genes of b outside the slice stay where they are unless they conflict
+        outside = np.ones(len(b), dtype=bool)
+        outside[l:h] = False
+        keep = outside & ~np.isin(b, a[l:h]) & ~np.isin(child, a[l:h])
+        assert np.array_equal(child[keep], b[keep])
+
+
+def test_mutate_keeps_permutations(orderings):
+    population = orderings.copy()
+    mutate(population, 1.0, np.random.default_rng(0))
+    assert is_permutation(population)
+    assert not np.array_equal(population, orderings)
+
+
+def test_evolve_scores_population(abp, orderings):
+    population, makespans, generations = evolve(abp, orderings, 5, seed=0)
+    assert generations == 5
+    assert is_permutation(population)
+    assert makespans.tolist() == [
+        simulate_boarding(abp, ids)[0] for ids in population.tolist()
+    ]
+    # The elite are kept, the best makespan never gets worse
+    assert makespans.min() <= abp.evaluator.batch_makespans(orderings).min()
+    assert makespans.min() >= bounds.lower_bound(abp)
+
+
+def test_genetic_solve(abp):
+    solution = Genetic(population_size=16, generations=10, seed=0).solve(abp)
+    ids = [p.id for p in solution.ordering]
+    assert sorted(ids) == list(range(abp.num_passengers))
+    assert solution.makespan == simulate_boarding(abp, ids)[0] / 10
+    assert solution.makespan <= MaxSettleRow().solve(abp).makespan
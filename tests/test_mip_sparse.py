@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+from scipy.optimize import Bounds, milp
+
+import bounds
+from conftest import simulate_boarding
+from engines.heuristic_search import get_best_heuristic
+from engines.mip_sparse import (
+    build_matrices,
+    gurobi_model,
+    highs_constraint,
+    variable_indices,
+)
+from util import AirplaneBoardingProblem, AbpFilepath, discretise
+
+# Small enough for a restricted Gurobi licence
+INSTANCES = [AbpFilepath(10, 2, 0), AbpFilepath(10, 2, 6)]
+
+
+@pytest.fixture(params=INSTANCES, ids=lambda f: "{}_{}__{}".format(*f))
+def small_abp(request) -> AirplaneBoardingProblem:
+    return AirplaneBoardingProblem(request.param)
+
+
+def fixed_ordering(matrices, abp: AirplaneBoardingProblem, ids) -> tuple:
+    """Variable bounds with ``X`` fixed to boarding ``ids``."""
+    X, *_ = variable_indices(abp.num_passengers, abp.num_rows)
+    lb, ub = matrices.lb.copy(), matrices.ub.copy()
+    ub[X] = 0
+    lb[X[ids, np.arange(len(ids))]] = ub[X[ids, np.arange(len(ids))]] = 1
+    return lb, ub
+
+
+def test_matrices_match_gurobipy_model(small_abp):
+    gp = pytest.importorskip("gurobipy")
+    from engines.mip import MIP
+
+    m, _, _ = MIP.build_model(small_abp)
+    m.update()
+    upper_bound = discretise(get_best_heuristic(small_abp).makespan)
+    matrices = build_matrices(small_abp, upper_bound, bounds.lower_bound(small_abp))
+
+    # Variables and constraints are added in the same order
+    A = m.getA().tocsr()
+    assert A.shape == matrices.A.shape
+    assert A.nnz == matrices.A.nnz
+    assert abs(A - matrices.A).max() == 0
+    constraints, variables = m.getConstrs(), m.getVars()
+    assert m.getAttr("Sense", constraints) == matrices.sense.tolist()
+    assert m.getAttr("RHS", constraints) == matrices.rhs.tolist()
+    assert m.getAttr("LB", variables) == matrices.lb.tolist()
+    assert m.getAttr("UB", variables) == matrices.ub.tolist()
+    assert m.getAttr("Obj", variables) == matrices.c.tolist()
+    assert np.array_equal(
+        np.array(m.getAttr("VType", variables)) == gp.GRB.BINARY,
+        matrices.integrality.astype(bool),
+    )
+
+
+def test_fixed_ordering_gives_simulated_makespan(small_abp):
+    # With X fixed the model schedules the ordering exactly as it boards
+    rng = np.random.default_rng(0)
+    for _ in range(5):
+        ids = rng.permutation(small_abp.num_passengers)
+        makespan = simulate_boarding(small_abp, ids.tolist())[0]
+        matrices = build_matrices(small_abp, makespan)
+        result = milp(
+            matrices.c,
+            integrality=matrices.integrality,
+            bounds=Bounds(*fixed_ordering(matrices, small_abp, ids)),
+            constraints=highs_constraint(matrices),
+        )
+        assert result.success
+        assert result.fun == pytest.approx(makespan)
+
+
+def test_gurobi_model_fixed_ordering(small_abp):
+    gp = pytest.importorskip("gurobipy")
+
+    ids = np.random.default_rng(1).permutation(small_abp.num_passengers)
+    makespan = simulate_boarding(small_abp, ids.tolist())[0]
+    matrices = build_matrices(small_abp, makespan, bounds.lower_bound(small_abp))
+    lb, ub = fixed_ordering(matrices, small_abp, ids)
+    m, v = gurobi_model(matrices._replace(lb=lb, ub=ub))
+    m.params.OutputFlag = 0
+    m.optimize()
+    assert m.Status == gp.GRB.OPTIMAL
+    assert m.ObjVal == pytest.approx(makespan)
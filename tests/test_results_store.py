@@ -0,0 +1,138 @@
+import json
+import sqlite3
+
+import numpy as np
+import pytest
+
+import results_store
+from conftest import simulate_boarding
+from util import AirplaneBoardingProblem, AbpFilepath
+
+FILEPATH = AbpFilepath(10, 2, 6)
+INSTANCE_NAME = "mp_sp__10_2__6"
+
+
+@pytest.fixture
+def db_path(tmp_path) -> str:
+    path = str(tmp_path / "results.db")
+    # Already imported, so connect leaves the results/ tree alone
+    with sqlite3.connect(path) as conn:
+        conn.execute(results_store.SCHEMA[-1])
+        conn.execute("INSERT INTO meta VALUES ('imported', '0')")
+    return path
+
+
+@pytest.fixture
+def random_ids() -> list[int]:
+    abp = AirplaneBoardingProblem(FILEPATH)
+    return np.random.default_rng(0).permutation(abp.num_passengers).tolist()
+
+
+def result(algorithm: str, order: list[int], objective_value=None, **kwargs) -> dict:
+    return dict(
+        algorithm=algorithm,
+        instance_name=INSTANCE_NAME,
+        objective_value=objective_value,
+        order=order,
+        lower_bound="-",
+        upper_bound="-",
+        gap="-",
+        computation_time=1.0,
+        **kwargs,
+    )
+
+
+def test_insert_simulates_makespan(db_path, random_ids):
+    conn = results_store.connect(db_path)
+    profile = dict(phases=dict(search=1.0), counters=dict(simulations=3))
+    # CP runs can report a broken objective value
+    results_store.insert_result(
+        conn, result("cp", random_ids, objective_value=-8.36e17, profile=profile)
+    )
+
+    stored = results_store.latest_result(conn, INSTANCE_NAME, "cp")
+    makespan, _ = simulate_boarding(AirplaneBoardingProblem(FILEPATH), random_ids)
+    assert stored["makespan"] == makespan / 10
+    assert stored["objective_value"] == -8.36e17
+    assert stored["order"] == random_ids
+    assert stored["profile"] == profile
+    assert stored["lower_bound"] is None
+    assert results_store.has_result(conn, INSTANCE_NAME, "cp")
+    assert not results_store.has_result(conn, INSTANCE_NAME, "mip")
+
+
+def test_best_known_ranks_on_makespan(db_path, random_ids):
+    conn = results_store.connect(db_path)
+    abp = AirplaneBoardingProblem(FILEPATH)
+    evaluator = abp.evaluator
+    better = sorted(random_ids, key=lambda i: -abp.passengers[i].row)
+    assert evaluator.makespan(better) < evaluator.makespan(random_ids)
+
+    results_store.insert_result(conn, result("cp", random_ids, objective_value=1.0))
+    results_store.insert_result(conn, result("mip", better, objective_value=500.0))
+    # Not a full ordering, so never ranked
+    results_store.insert_result(conn, result("lns", random_ids[1:]))
+
+    (best,) = results_store.best_known(conn)
+    assert best["algorithm"] == "mip"
+    assert best["makespan"] == evaluator.makespan(better) / 10
+    assert results_store.latest_result(conn, INSTANCE_NAME, "lns")["makespan"] is None
+    assert {r["algorithm"] for r in results_store.latest_results(conn, 10, 2)} == {
+        "cp",
+        "mip",
+        "lns",
+    }
+
+
+def test_import_results_tree(db_path, random_ids, tmp_path):
+    results_dir = tmp_path / "results"
+    (results_dir / "10_2").mkdir(parents=True)
+    for algorithm in ["cp", "maxsettlerow"]:
+        with open(results_dir / "10_2" / f"{algorithm}.json", "w") as f:
+            json.dump(result(algorithm, random_ids), f)
+
+    conn = results_store.connect(db_path)
+    with conn:
+        assert results_store.import_results_tree(conn, str(results_dir)) == 2
+    makespan, _ = simulate_boarding(AirplaneBoardingProblem(FILEPATH), random_ids)
+    for algorithm in ["cp", "maxsettlerow"]:
+        stored = results_store.latest_result(conn, INSTANCE_NAME, algorithm)
+        assert stored["makespan"] == makespan / 10
+
+
+def test_connect_backfills_makespan(db_path, random_ids):
+    # A database from before runs were profiled or simulated again
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("""CREATE TABLE runs (
+            id INTEGER PRIMARY KEY,
+            algorithm TEXT NOT NULL,
+            instance_name TEXT NOT NULL,
+            num_rows INTEGER NOT NULL,
+            num_cols INTEGER NOT NULL,
+            test_number INTEGER NOT NULL,
+            objective_value REAL,
+            lower_bound REAL,
+            upper_bound REAL,
+            gap REAL,
+            computation_time REAL,
+            ordering TEXT NOT NULL,
+            created_at REAL NOT NULL
+        )""")
+        conn.execute(
+            "CREATE INDEX runs_instance ON runs (instance_name, objective_value)"
+        )
+        conn.execute(
+            """INSERT INTO runs (algorithm, instance_name, num_rows, num_cols,
+            test_number, objective_value, ordering, created_at)
+            VALUES ('cp', ?, 10, 2, 6, -8.36e17, ?, 0)""",
+            (INSTANCE_NAME, json.dumps(random_ids)),
+        )
+
+    conn = results_store.connect(db_path)
+    stored = results_store.latest_result(conn, INSTANCE_NAME, "cp")
+    makespan, _ = simulate_boarding(AirplaneBoardingProblem(FILEPATH), random_ids)
+    assert stored["makespan"] == makespan / 10
+    assert stored["profile"] is None
+    # Connecting again leaves the database as it is
+    results_store.connect(db_path).close()
+    assert len(results_store.best_known(conn)) == 1
@@ -0,0 +1,13 @@
+import bounds
+from conftest import simulate_boarding
+from engines.max_settle_row import MaxSettleRow
+from engines.simulated_annealing import SimulatedAnnealing
+
+
+def test_simulated_annealing(abp):
+    start = MaxSettleRow().solve(abp)
+    solution = SimulatedAnnealing(time_limit=None, max_iterations=50, seed=0).solve(abp)
+    ids = [p.id for p in solution.ordering]
+    assert sorted(ids) == list(range(abp.num_passengers))
+    assert solution.makespan == simulate_boarding(abp, ids)[0] / 10
+    assert bounds.lower_bound(abp) / 10 <= solution.makespan <= start.makespan
@@ -1,16 +1,23 @@
 import json
-import os.path
 from collections import namedtuple
 from abc import ABC, abstractmethod
+import threading
 import time
-import matplotlib.pyplot as plt
-import matplotlib.colors as mcolors
-import pandas as pd
-import plotly.express as px
+import profiling
+from evaluator import BoardingEvaluator
+from instance_store import InstanceArrays, json_path, load_instance
+
+
+class Passenger(
+    namedtuple("Passenger", ["row", "column", "settle_time", "move_times", "id"])
+):
+    # Passengers key the model dictionaries, hashing the id alone avoids
+    # hashing move_times on every lookup. abp.passengers[p.id] is p.
+    __slots__ = ()
+
+    def __hash__(self):
+        return self.id
 
-Passenger = namedtuple(
-    "Passenger", ["row", "column", "settle_time", "move_times", "id"]
-)
 
 AbpFilepath = namedtuple("AbpFilepath", ["num_rows", "num_columns", "test_number"])
 CURRENT_ABP_PROBLEM = AbpFilepath(num_rows=10, num_columns=2, test_number=6)
@@ -34,44 +41,54 @@ def time_taken_at_row(p: Passenger, r: int) -> int:
 
 
 def load_file(filepath: AbpFilepath):
-    num_rows, num_columns, test_num = filepath
-    script_dir = os.path.dirname(__file__)
-    filename = os.path.join(
-        script_dir,
-        f"data/mp_sp/{num_rows}_{num_columns}/mp_sp__{num_rows}_{num_columns}__{test_num}.json",
-    )
-    f = open(filename, "r")
+    f = open(json_path(filepath), "r")
     json_data = json.load(f)
     f.close()
     return json_data
 
 
 class AirplaneBoardingProblem:
-    def __init__(self, filepath: AbpFilepath):
+    def __init__(self, filepath: AbpFilepath, instance: InstanceArrays | None = None):
+        # Instances that are not in data/mp_sp, e.g. synthetic ones, pass their arrays
         self.filepath = filepath
-        json_data = load_file(filepath)
-        self.num_rows: int = len(json_data["n_seats_row"])
-        self.num_cols: int = sum(json_data["n_seats_row"][0])
-        self.num_passengers: int = len(json_data["times_move"])
+        if instance is None:
+            instance = load_instance(filepath)
+        self.num_rows: int = instance.num_rows
+        self.num_cols: int = instance.num_cols
+        self.num_passengers: int = len(instance.times_clear)
+        # Only used by the stochastic evaluation in robustness.py
+        self.pax_luggage = instance.pax_luggage
+        self.times_seat_interference = instance.times_seat_interference
+        # Travel group of every passenger or -1, boards together in GroupPolicy
+        self.pax_group = instance.pax_group
 
         self.passengers: list[Passenger] = [
             Passenger(
                 id=i,
-                row=json_data["pax_seats"][i][0] + 1,
-                column=json_data["pax_seats"][i][1] + 1,
-                settle_time=int(10 * json_data["times_clear"][i]),
-                move_times=(
-                    given_times := tuple(
-                        int(10 * m_time) for m_time in json_data["times_move"][i]
-                    )
+                row=seat[0] + 1,
+                column=seat[1] + 1,
+                settle_time=settle_time,
+                move_times=tuple(move_times),
+            )
+            for i, (seat, settle_time, move_times) in enumerate(
+                zip(
+                    instance.pax_seats.tolist(),
+                    instance.times_clear.tolist(),
+                    instance.times_move.tolist(),
                 )
-                + tuple(0 for _ in range(self.num_rows - len(given_times))),
             )
-            for i in range(self.num_passengers)
         ]
 
         self.order = range(1, len(self.passengers) + 1)
         self.rows = range(1, self.num_rows + 1)
+        self._evaluator = None
+
+    @property
+    def evaluator(self) -> BoardingEvaluator:
+        # Rebuilt if the passengers were swapped out, e.g. on a relaxed copy.
+        if self._evaluator is None or self._evaluator.passengers is not self.passengers:
+            self._evaluator = BoardingEvaluator(self.passengers, self.num_rows)
+        return self._evaluator
 
 
 class AbpSolution:
@@ -88,49 +105,32 @@ class AbpSolution:
         self.ordering = ordering
 
         self.computation_time = None
+        self._passenger_enter_row = None
         self.makespan = (makespan or self.simulate_boarding()) / 10
         self.finish_times = finish_times
         self.lower_bound, self.upper_bound = range_
+        self.profile: dict | None = None  # Phases and counters, see profiling
 
     def simulate_boarding(self) -> int:
-        abp = self.problem
-        passenger_seated_times = [0 for _ in range(abp.num_passengers)]
-        # Time a passenger enters a row
-        self.passenger_enter_row = []
-        # Stores the latest time a passenger has been in that row (blocking)
-        row_blockage = [0 for _ in range(abp.num_rows + 1)]
-
-        for i, p in enumerate(self.ordering):
-            self.passenger_enter_row.append([0 for _ in range(p.row + 1)])
-
-            for row in range(p.row + 1):
-                # Maximum of either passenger moving or when the row becomes free
-                self.passenger_enter_row[i][row] = (
-                    row_blockage[0]
-                    if row == 0
-                    else max(
-                        self.passenger_enter_row[i][row - 1] + p.move_times[row - 2],
-                        row_blockage[row],
-                    )
-                )
-
-                if row > 0:
-                    row_blockage[row - 1] = self.passenger_enter_row[i][row]
-
-                if row == p.row:
-                    passenger_seated_time = (
-                        self.passenger_enter_row[i][row] + p.settle_time
-                    )
-                    row_blockage[row] = passenger_seated_time
-                    passenger_seated_times[i] = passenger_seated_time
-
-        makespan = max(passenger_seated_times, default=0)
-        return int(makespan)
+        return self.problem.evaluator.makespan([p.id for p in self.ordering])
+
+    @property
+    def passenger_enter_row(self) -> list[list[int]]:
+        # Time a passenger enters a row, only built when asked for
+        if self._passenger_enter_row is None:
+            self._passenger_enter_row = self.problem.evaluator.enter_times(
+                [p.id for p in self.ordering]
+            )
+        return self._passenger_enter_row
 
     def _get_boarding_group(self, boarding_position: int):
         return boarding_position // self.problem.num_rows
 
     def make_solution_plot(self):
+        # Plotting libraries are slow to import, headless solves never load them
+        import matplotlib.pyplot as plt
+        import matplotlib.colors as mcolors
+
         # For same colours
 
         mapping = {(p.row, p.column): i for i, p in enumerate(self.ordering)}
@@ -199,20 +199,31 @@ class AbpSolution:
         ax.set_aspect("equal")
         plt.show()
 
+    def row_finish_times(self) -> dict[tuple[int, int], int]:
+        """Time passenger ``p`` leaves row ``r`` (``TF`` in CP), keyed ``(p.id, r)``.
+
+        Leaving row ``r`` is entering row ``r + 1``, or sitting down in ``p.row``.
+        """
+        finish_times = {}
+        for p, enter_row in zip(self.ordering, self.passenger_enter_row):
+            for r in range(p.row):
+                finish_times[p.id, r] = enter_row[r + 1]
+            finish_times[p.id, p.row] = enter_row[p.row] + p.settle_time
+        return finish_times
+
     def make_gantt_chart(self):
+        import pandas as pd
+        import plotly.express as px
+
         if not self.finish_times:
-            self.finish_times = {
-                (p, r): self.passenger_enter_row[i][r]
-                for i, p in enumerate(self.ordering)
-                for r in range(len(self.passenger_enter_row[i]) - 1)
-            }
+            self.finish_times = self.row_finish_times()
 
         df = pd.DataFrame(
             [
                 dict(
                     Task=f"Passenger {p.row, p.column}",
-                    Start=self.finish_times[p, r - 1],
-                    Delta=self.finish_times[p, r],
+                    Start=self.finish_times[p.id, r - 1],
+                    Delta=self.finish_times[p.id, r],
                     Resource=f"Row {r}",
                 )
                 for i, p in enumerate(self.ordering)
@@ -263,11 +274,28 @@ class AbpSolution:
 
 
 class AbpSolver(ABC):
+    # Cores a single solve keeps busy, used to schedule parallel sweeps
+    threads: int = 1
+    # cProfile stats of the solve are dumped here when set
+    profile_path: str | None = None
+    # Set to cancel a running solve, anytime engines return their best so far
+    stop_event: threading.Event | None = None
+
+    def stopped(self) -> bool:
+        return self.stop_event is not None and self.stop_event.is_set()
+
+    def _gurobi_stop_callback(self, model, where):
+        if self.stopped():
+            model.terminate()
+
     def solve(self, abp: AirplaneBoardingProblem) -> AbpSolution:
         start = time.time()
-        solution = self.solve_implementation(abp)
+        with profiling.profiled(self.profile_path) as profile:
+            solution = self.solve_implementation(abp)
         solution.computation_time = time.time() - start
         solution.type = type(self).__name__
+        if profile is not None:
+            solution.profile = profile.as_dict()
         return solution
 
     @abstractmethod